@@ -2,27 +2,59 @@ from http.server import BaseHTTPRequestHandler
 import json
 import sys
 import os
+import tempfile
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 from defeasible_tableau import Tableau
 from propositional_parser import parse
 from reasoning_elements.rule import Rule
 from decision_support_system import DecisionSupportSystem
+from i_o.rule_cache import load_rule_base
+from reasoning_elements.budget import Budget
+
+sample_rule_sets = os.path.join(
+    os.path.dirname(__file__), '..', 'src', 'sample_rule_sets')
+# The deployed source directory may not be writable, so the parsed rule bases are cached elsewhere.
+rule_cache_directory = os.environ.get(
+    'RULE_CACHE_DIRECTORY', os.path.join(tempfile.gettempdir(), 'rulecache'))
+# Limits for each evaluation, so that the server answers in time even if the tableau would grow too big.
+# If a limit is reached, the arguments found so far are returned, with the flag 'partial'.
+# There is no memory limit by default, since tracing the memory slows the evaluation down.
+time_limit = float(os.environ.get('TABLEAU_TIME_LIMIT', '5'))
+memory_limit = (int(os.environ['TABLEAU_MEMORY_LIMIT'])
+                if 'TABLEAU_MEMORY_LIMIT' in os.environ else None)
 
 class handler(BaseHTTPRequestHandler):
 
     def do_POST(self):
         length = int(self.headers['Content-Length'])
         body = self.rfile.read(length).decode('utf-8')
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html')
-        self.end_headers()
         input = json.loads(body)
+        question = parse(input['question'])
+        initial_information = {parse(p) for p
+                               in input['initial_information']}
+        rules = {Rule(parse(a), parse(b)) for (a, b)
+                 in input['rules']}
+        if 'rule_base' in input:
+            # Name of a file in `src/sample_rule_sets/`, whose rules are added to the given ones.
+            # The parsed rule base is cached on disk.
+            try:
+                rule_sets = load_rule_base(
+                    os.path.join(sample_rule_sets,
+                                 os.path.basename(input['rule_base'])),
+                    rule_cache_directory)
+            except FileNotFoundError:
+                self.send_error(404, 'Unknown rule base: ' + input['rule_base'])
+                return
+            for set_rules, set_facts in rule_sets.values():
+                rules.update(set_rules)
+                initial_information.update(set_facts)
+        # The rule bases cover much more than one question, so only the relevant part goes into the tableau.
         t = Tableau(
-            question=parse(input['question']),
-            initial_information={parse(p) for p
-                                 in input['initial_information']},
-            rules={Rule(parse(a), parse(b)) for (a, b)
-                   in input['rules']}
+            question=question,
+            initial_information=initial_information,
+            rules=rules,
+            relevant_only=True,
+            budget=Budget(seconds=time_limit, memory=memory_limit)
         )
         flag, result = t.evaluate()
         if flag == 'known':
@@ -30,16 +62,23 @@ class handler(BaseHTTPRequestHandler):
             output = json.dumps({'flag': 'known',
                                  'result': [[str(p) for p in pro],
                                           [str(p) for p in contra]]})
+        if flag == 'partial':
+            pro, contra = result
+            output = json.dumps({'flag': 'partial',
+                                 'result': [[str(p) for p in pro],
+                                          [str(p) for p in contra]],
+                                 'statistics': t.budget.statistics()})
         if flag == 'unknown':
             question = DecisionSupportSystem(
-                question=parse(input['question']),
-                initial_information={parse(p) for p
-                                     in input['initial_information']},
-                rules={Rule(parse(a), parse(b)) for (a, b)
-                       in input['rules']}
+                question=question,
+                initial_information=initial_information,
+                rules=rules
             ).get_promising_tests(result)
             output = json.dumps({'flag': 'unknown',
                                  'result': list(question)})
         print(output.encode('utf-8'))
+        self.send_response(200)
+        self.send_header('Content-type', 'text/html')
+        self.end_headers()
         self.wfile.write(output.encode('utf-8'))
 
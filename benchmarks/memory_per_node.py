@@ -0,0 +1,90 @@
+"""
+Measures how much memory the defeasible tableaux of the (non-skipped) tests in
+`defeasible_tableau_test.py` hold, per tableau node.
+Run with `poetry run python benchmarks/memory_per_node.py`.
+
+Each test builds its tableaux through a recording subclass of `Tableau`,
+which keeps them alive until the test is done. The memory that is still allocated
+at that point (measured with `tracemalloc`) is what the tableaux hold:
+the nodes, their argument sets, and the arguments and propositions in them.
+
+Results on the development machine (Python 3.11), in bytes per node:
+
+    test                                     nodes   before   interned + slots   shared branches
+    test_apply_1_rule                            7     2689               1509              1141
+    test_chain_3_rules                          31     1948               1309               655
+    test_complex_nondefeasible_proposition     117      871                707               326
+    test_law_example                           793     1611               1187               213
+    test_logic_example_1                        87     1489               1066               411
+    total                                     1095     1569               1135               289
+
+"before" is the tree before propositions, rules, tests and arguments were interned and given `__slots__`.
+"shared branches" is with nodes that only store how their arguments differ from those of their parent,
+instead of a copy of the whole argument set.
+(The number of nodes of some tests varies a little between runs, with the iteration order of sets.)
+"""
+import gc
+import os
+import sys
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+import defeasible_tableau_test
+from defeasible_tableau import Tableau
+
+
+class RecordingTableau(Tableau):
+    instances = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        RecordingTableau.instances.append(self)
+
+
+def count_nodes(tableau) -> int:
+    count = 0
+    stack = [tableau.root]
+    while len(stack) > 0:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    return count
+
+
+def tests():
+    for name in dir(defeasible_tableau_test):
+        test = getattr(defeasible_tableau_test, name)
+        if (name.startswith('test_') and callable(test)
+                and not any(mark.name == 'skip'
+                            for mark in getattr(test, 'pytestmark', []))):
+            yield name, test
+
+
+def main():
+    defeasible_tableau_test.Tableau = RecordingTableau
+    # Warm up, so that one-off allocations (e.g. by the parser) are not measured.
+    for _, test in tests():
+        test()
+    total_bytes = 0
+    total_nodes = 0
+    print('{:45} {:>8} {:>12} {:>10}'.format(
+        'test', 'nodes', 'bytes', 'bytes/node'))
+    for name, test in tests():
+        RecordingTableau.instances = []
+        gc.collect()
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        test()
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        nodes = sum(count_nodes(t) for t in RecordingTableau.instances)
+        total_bytes += after - before
+        total_nodes += nodes
+        print('{:45} {:>8} {:>12} {:>10.0f}'.format(
+            name, nodes, after - before, (after - before) / nodes))
+    print('{:45} {:>8} {:>12} {:>10.0f}'.format(
+        'total', total_nodes, total_bytes, total_bytes / total_nodes))
+
+
+if __name__ == '__main__':
+    main()
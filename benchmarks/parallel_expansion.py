@@ -0,0 +1,68 @@
+"""
+Measures how `Tableau.evaluate` scales when the first expansion is shared by several worker processes
+(see `Node.expand_in_parallel`), on the British Nationality Act examples from `evaluate_rounds.py`.
+Run with `poetry run python benchmarks/parallel_expansion.py`.
+
+The results are checked to be the same as those of the serial evaluation.
+
+Results on the development machine (Python 3.11), best of 3 runs, in seconds,
+with a `parallel_threshold` of 2 decomposable arguments:
+
+    example                           serial        1        2        4        8
+    British Nationality Act            0.689    0.769    0.734    0.771    0.806
+    British Nationality Act, parent    0.981    1.003    1.026    1.077    1.125
+
+That machine has only one core, so these numbers only show the overhead of the parallel mode:
+starting the processes and pickling the subtrees (about 100 kB for the 6000 nodes of an expanded tableau,
+see `Node.__reduce__`). The expansion is about 80% of the time of the evaluation, and the tableau is split into
+two leaves per worker, so on a machine with more cores, the speedup is limited by the biggest of these subtrees.
+"""
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from defeasible_tableau import Tableau
+from evaluate_rounds import british_nationality_act
+
+EXAMPLES = [
+    ('British Nationality Act', british_nationality_act),
+    ('British Nationality Act, parent',
+     lambda: british_nationality_act(['ParentBritishCitizen'])),
+]
+WORKERS = [None, 1, 2, 4, 8]
+
+
+def measure(build, workers, repetitions: int = 3):
+    """
+    Returns the result and the best time of `evaluate` on the example, with the given number of workers.
+    """
+    best = float('inf')
+    for _ in range(repetitions):
+        example = build()
+        tableau = Tableau(question=example.question,
+                          initial_information=example.initial_information,
+                          rules=example.rules,
+                          workers=workers,
+                          parallel_threshold=2)
+        start = time.perf_counter()
+        result = tableau.evaluate()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    print('{:30} {:>8} {:>8} {:>8} {:>8} {:>8}'.format('example', 'serial', *WORKERS[1:]))
+    for name, build in EXAMPLES:
+        times = []
+        serial = None
+        for workers in WORKERS:
+            result, seconds = measure(build, workers)
+            if serial is None:
+                serial = result
+            assert result == serial
+            times.append(seconds)
+        print('{:30} {:>8.3f} {:>8.3f} {:>8.3f} {:>8.3f} {:>8.3f}'.format(name, *times))
+
+
+if __name__ == '__main__':
+    main()
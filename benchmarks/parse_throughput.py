@@ -0,0 +1,61 @@
+"""
+Measures how many formulas per second `propositional_parser.parse` handles,
+on the formulas from the sample rule sets in `src/sample_rule_sets/`.
+Run with `poetry run python benchmarks/parse_throughput.py`.
+
+Three ways of parsing are compared:
+    - building a new Lark parser for every formula (as `parse` used to do),
+    - the prebuilt module-level parser, without the cache,
+    - `parse` itself, with the cache (after a first pass filled it).
+"""
+import glob
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from lark import Lark
+import propositional_parser
+from propositional_parser import parse, logic_grammar, TreeToJson2
+
+
+def formulas():
+    for filename in glob.glob(os.path.join(os.path.dirname(__file__), '..', 'src', 'sample_rule_sets', '*.json')):
+        with open(filename, encoding='utf-8') as json_file:
+            data = json.load(json_file)
+        for rule_set in data.values():
+            for rule in rule_set['rules'].values():
+                yield rule['antecedence']
+                yield rule['consequence']
+            yield from rule_set['facts']
+
+
+def throughput(function, inputs, repetitions) -> float:
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        for a in inputs:
+            function(a)
+    return repetitions * len(inputs) / (time.perf_counter() - start)
+
+
+def main():
+    inputs = list(formulas())
+    print(len(inputs), 'formulas')
+    print('{:30} {:>12.0f} formulas/s'.format(
+        'new parser per call',
+        throughput(lambda a: Lark(logic_grammar, parser='lalr',
+                                  transformer=TreeToJson2()).parse(a),
+                   inputs, 1)))
+    print('{:30} {:>12.0f} formulas/s'.format(
+        'prebuilt parser',
+        throughput(propositional_parser.parser.parse, inputs, 20)))
+    parse.cache_clear()
+    for a in inputs:
+        parse(a)
+    print('{:30} {:>12.0f} formulas/s'.format(
+        'prebuilt parser and cache',
+        throughput(parse, inputs, 1000)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+from reasoning_elements.proposition import *
+from propositional_parser import toProposition
+from typing import *
+import functools
+
+"""
+Reduced ordered binary decision diagrams (ROBDDs) for propositions.
+A BDD represents a proposition as a decision graph over its variables in a fixed order.
+Equal subgraphs are stored only once (in the unique table), so the graph of a proposition is canonical:
+Two propositions are equivalent exactly when they have the same node, and a proposition is valid exactly
+when its node is the `TRUE` node. Once the propositions are built, these questions are answered in constant time.
+
+All propositions are built in one shared `BDD` manager, so they share their subgraphs, too.
+Building goes through `apply`, whose results are remembered in the computed table (the apply cache).
+The computed table is cleared when it reaches `cache_limit` entries, so that it does not grow without bound.
+"""
+
+# The two terminal nodes
+FALSE = 0
+TRUE = 1
+
+
+class BDD:
+    """
+    A shared manager for BDDs. Nodes are numbers: `FALSE`, `TRUE`, or a position in the node table.
+    """
+
+    def __init__(self, order: Iterable[str] = (), cache_limit: int = 1 << 18):
+        """
+        The variables are ordered as given; variables that are not in the order yet are added when they occur,
+        in the order in which they are first met (see `variable_order`).
+        """
+        self.order: List[str] = []
+        self.levels: Dict[str, int] = {}
+        # For each node: the level of its variable, and its children if the variable is false (low) or true (high)
+        self.variable: List[int] = [-1, -1]
+        self.low: List[int] = [FALSE, TRUE]
+        self.high: List[int] = [FALSE, TRUE]
+        self.unique: Dict[Tuple[int, int, int], int] = {}
+        self.cache: Dict[tuple, int] = {}
+        self.cache_limit = cache_limit
+        # The nodes of the propositions built so far
+        self.built: Dict[Proposition, int] = {}
+        self.add_variables(order)
+
+    def add_variables(self, names: Iterable[str]):
+        for name in names:
+            if name not in self.levels:
+                self.levels[name] = len(self.order)
+                self.order.append(name)
+
+    def level(self, node: int) -> int:
+        """
+        The level of the variable of the node; the terminal nodes come after all variables.
+        """
+        return len(self.order) if node <= TRUE else self.variable[node]
+
+    def node(self, level: int, low: int, high: int) -> int:
+        """
+        Returns the node for `if <variable at level> then high else low`, reusing an existing node if there is one.
+        """
+        if low == high:
+            return low
+        key = (level, low, high)
+        node = self.unique.get(key)
+        if node is None:
+            node = len(self.variable)
+            self.variable.append(level)
+            self.low.append(low)
+            self.high.append(high)
+            self.unique[key] = node
+        return node
+
+    def build(self, proposition) -> int:
+        """
+        Returns the node of the proposition.
+        The subpropositions are built bottom-up, and each only once.
+        """
+        proposition = toProposition(proposition)
+        node = self.built.get(proposition)
+        if node is not None:
+            return node
+        self.add_variables(variable_order(proposition))
+        for p in proposition.subpropositions():
+            if p in self.built:
+                continue
+            if isinstance(p, Variable):
+                node = self.node(self.levels[p.name], FALSE, TRUE)
+            elif isinstance(p, TruthValue):
+                node = TRUE if p.value else FALSE
+            elif isinstance(p, Not):
+                node = self.negate(self.built[p.children[0]])
+            else:
+                # Conjunctions and disjunctions can have more than two children; they are combined one after another.
+                node = functools.reduce(functools.partial(self.apply, type(p)),
+                                        [self.built[c] for c in p.children])
+            self.built[p] = node
+        return self.built[proposition]
+
+    def apply(self, operator: Type[ComplexProposition], u: int, v: int) -> int:
+        """
+        Combines two nodes with a binary operator (such as `And`).
+        For the terminal nodes, the operator's `bitwise` version is used, on single bits.
+        The recursion is as deep as the number of variables.
+        """
+        if u <= TRUE and v <= TRUE:
+            return operator.bitwise(None, TRUE, u, v)
+        key = (operator, u, v)
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+        level = min(self.level(u), self.level(v))
+        u_low, u_high = self.cofactors(u, level)
+        v_low, v_high = self.cofactors(v, level)
+        result = self.node(level,
+                           self.apply(operator, u_low, v_low),
+                           self.apply(operator, u_high, v_high))
+        self.remember(key, result)
+        return result
+
+    def negate(self, u: int) -> int:
+        if u <= TRUE:
+            return TRUE - u
+        key = (Not, u)
+        result = self.cache.get(key)
+        if result is None:
+            result = self.node(self.variable[u],
+                               self.negate(self.low[u]),
+                               self.negate(self.high[u]))
+            self.remember(key, result)
+        return result
+
+    def cofactors(self, u: int, level: int) -> Tuple[int, int]:
+        if self.level(u) == level:
+            return self.low[u], self.high[u]
+        return u, u
+
+    def remember(self, key: tuple, result: int):
+        if len(self.cache) >= self.cache_limit:
+            self.cache.clear()
+        self.cache[key] = result
+
+    def is_valid(self, proposition) -> bool:
+        return self.build(proposition) == TRUE
+
+    def is_satisfiable(self, proposition) -> bool:
+        return self.build(proposition) != FALSE
+
+    def is_equivalent(self, a, b) -> bool:
+        return self.build(a) == self.build(b)
+
+    def entails(self, premise, conclusion) -> bool:
+        """
+        Whether the conclusion is true in every model of the premise.
+        """
+        return self.apply(Implies, self.build(premise),
+                          self.build(conclusion)) == TRUE
+
+    def count_models(self, proposition, variables: Iterable[str] = None) -> int:
+        """
+        Counts the models of the proposition over the given variables (by default, the variables of the proposition),
+        which must include all variables that the proposition depends on.
+        """
+        proposition = toProposition(proposition)
+        root = self.build(proposition)
+        variables = set(proposition.variables() if variables is None else variables)
+        self.add_variables(sorted(variables))
+        # `counts[u]` is the number of models of `u` over the variables from its level downwards.
+        counts: Dict[int, int] = {FALSE: 0, TRUE: 1}
+        for u in self.nodes(root):
+            level = self.variable[u]
+            counts[u] = sum(counts[c] << (self.level(c) - level - 1)
+                            for c in (self.low[u], self.high[u]))
+        # Variables above the root can have any value; then only the requested variables are counted.
+        total = counts[root] << self.level(root)
+        return total >> (len(self.order) - len(variables))
+
+    def models(self, proposition, variables: Iterable[str] = None) -> Iterator[Dict[str, bool]]:
+        """
+        Yields all models of the proposition over the given variables (by default, the variables of the proposition),
+        which must include all variables that the proposition depends on.
+        """
+        proposition = toProposition(proposition)
+        root = self.build(proposition)
+        names = sorted(proposition.variables() if variables is None else variables,
+                       key=lambda name: self.levels.get(name, len(self.order)))
+        levels = [self.levels.get(name, len(self.order)) for name in names]
+        # Each item: a node, the position of the next variable in `names`, and the values so far
+        stack: List[Tuple[int, int, Dict[str, bool]]] = [(root, 0, {})]
+        while len(stack) > 0:
+            u, i, model = stack.pop()
+            if u == FALSE:
+                continue
+            if i == len(names):
+                yield model
+                continue
+            if levels[i] == self.level(u):
+                children = (self.low[u], self.high[u])
+            else:
+                # The node does not depend on this variable.
+                children = (u, u)
+            stack.append((children[1], i + 1, {**model, names[i]: True}))
+            stack.append((children[0], i + 1, {**model, names[i]: False}))
+
+    def nodes(self, root: int) -> List[int]:
+        """
+        Returns the non-terminal nodes reachable from `root`, children before their parents.
+        """
+        order: List[int] = []
+        seen: Set[int] = {FALSE, TRUE}
+        stack = [root]
+        while len(stack) > 0:
+            u = stack[-1]
+            if u in seen:
+                stack.pop()
+                continue
+            missing = [c for c in (self.low[u], self.high[u]) if c not in seen]
+            if len(missing) > 0:
+                stack.extend(missing)
+            else:
+                stack.pop()
+                seen.add(u)
+                order.append(u)
+        return order
+
+    def size(self, proposition) -> int:
+        """
+        The number of non-terminal nodes of the proposition's BDD.
+        """
+        return len(self.nodes(self.build(proposition)))
+
+
+def variable_order(proposition: Proposition) -> List[str]:
+    """
+    Orders the variables of a proposition by their first occurrence from left to right.
+    Variables that occur close to each other in the proposition thus get close levels,
+    which tends to keep the BDD small.
+    """
+    names: Dict[str, None] = {}
+    seen: Set[Proposition] = set()
+    stack = [proposition]
+    while len(stack) > 0:
+        p = stack.pop()
+        if p in seen:
+            continue
+        seen.add(p)
+        if isinstance(p, Variable):
+            names[p.name] = None
+        stack.extend(reversed(getattr(p, 'children', ())))
+    return list(names)
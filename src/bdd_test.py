@@ -0,0 +1,68 @@
+from reasoning_elements.proposition import *
+from bdd import *
+from propositional_parser import parse
+import functools
+import itertools
+import random
+
+
+def test_canonical():
+    bdd = BDD()
+    assert bdd.is_valid('(p ∨ (q ∧ r)) → ((p ∨ q) ∧ (p ∨ r))')
+    assert bdd.is_valid('A ∨ (¬A)')
+    assert not bdd.is_valid('A ∨ B')
+    assert bdd.is_satisfiable('A ∨ B')
+    assert not bdd.is_satisfiable('(A ∨ B) ∧ (¬A) ∧ (¬B)')
+    assert bdd.is_equivalent('A → B', '(¬A) ∨ B')
+    assert bdd.is_equivalent('A ↔ B', '(A → B) ∧ (B → A)')
+    assert not bdd.is_equivalent('A → B', 'B → A')
+    assert bdd.entails('A ∧ B', 'A ∨ C')
+    assert not bdd.entails('A ∨ B', 'A')
+    # Equivalent propositions share their node
+    assert bdd.build('¬(A ∧ B)') == bdd.build('(¬A) ∨ (¬B)')
+
+
+def test_count_and_enumerate():
+    bdd = BDD()
+    assert bdd.count_models('A ∨ B') == 3
+    assert bdd.count_models('A ∨ B', ['A', 'B', 'C']) == 6
+    assert bdd.count_models('A ∧ (¬A)') == 0
+    assert bdd.count_models('true') == 1
+    assert list(bdd.models('A ∨ B')) == [{'A': False, 'B': True},
+                                         {'A': True, 'B': False},
+                                         {'A': True, 'B': True}]
+    assert len(list(bdd.models('A', ['A', 'C']))) == 2
+
+
+def test_agrees_with_truth_table():
+    generator = random.Random(0)
+    bdd = BDD()
+    for _ in range(200):
+        p = functools.reduce(
+            lambda a, op: op(a, Variable(generator.choice('ABCDEF'))),
+            [generator.choice([And, Or, Implies, Equiv]) for _ in range(8)],
+            Variable('A'))
+        if generator.random() < 0.5:
+            p = Not(p)
+        assert bdd.count_models(p) == p.count_models()
+        models = list(bdd.models(p))
+        assert len(models) == p.count_models()
+        assert all(p.eval(model) for model in models)
+
+
+def test_variable_order():
+    # With the pairs next to each other, the BDD of (a1 ↔ b1) ∧ ... stays linear in the number of pairs.
+    pairs = [(Variable('A' + str(i)), Variable('B' + str(i))) for i in range(12)]
+    p = functools.reduce(And, [Equiv(a, b) for a, b in pairs])
+    assert variable_order(p)[:4] == ['A0', 'B0', 'A1', 'B1']
+    assert BDD().size(p) == 36
+    # With all A's before all B's, it grows exponentially.
+    bad = BDD([a.name for a, _ in pairs] + [b.name for _, b in pairs])
+    assert bad.size(p) > 4000
+
+
+def test_cache_limit():
+    bdd = BDD(cache_limit=10)
+    p = parse('(A ∧ B) ∨ (C ∧ D) ∨ (E ∧ F)')
+    assert bdd.count_models(p) == BDD().count_models(p) == 37
+    assert len(bdd.cache) <= 10
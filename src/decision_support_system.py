@@ -4,6 +4,7 @@ from reasoning_elements.rule import *
 from defeasible_tableau import Tableau
 from i_o.user_input import *
 from i_o.file_reader import Configuration
+from i_o.rule_cache import load_rule_base
 from propositional_parser import toProposition
 from reasoning_elements.rule import Rule
 
@@ -29,6 +30,23 @@ class DecisionSupportSystem:
         self.initial_information = initial_information
         self.rules = rules
 
+    @classmethod
+    def from_rule_base(cls, filename, question: Proposition, rule_set: str = None) -> 'DecisionSupportSystem':
+        """
+        Creates a decision support system with the rules and facts from a rule base file,
+        either from all of its rule sets or only from the one named `rule_set`.
+        The parsed rule base is cached on disk (see `i_o/rule_cache.py`).
+        """
+        rule_sets = load_rule_base(filename)
+        if rule_set is not None:
+            rule_sets = {rule_set: rule_sets[rule_set]}
+        rules: Set[Rule] = set()
+        facts: Set[Proposition] = set()
+        for set_rules, set_facts in rule_sets.values():
+            rules.update(set_rules)
+            facts.update(set_facts)
+        return cls(question=question, initial_information=facts, rules=rules)
+
     def __str__(self):
 
         return
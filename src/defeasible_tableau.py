@@ -2,6 +2,9 @@ from typing import *
 from reasoning_elements.proposition import *
 from reasoning_elements.rule import *
 from reasoning_elements.node import *
+from reasoning_elements.argument_store import *
+from reasoning_elements.budget import *
+import concurrent.futures
 from reasoning_elements.test import *
 
 """
@@ -13,25 +16,59 @@ class Tableau:
     def __init__(self,
                  question: Proposition,
                  initial_information: Set[Proposition] = set(),
-                 rules: Set[Rule] = set()
+                 rules: Set[Rule] = set(),
+                 preprocess: str = None,
+                 relevant_only: bool = False,
+                 budget: Budget = None,
+                 workers: int = None,
+                 parallel_threshold: int = 8
                  ):
         """
         On initialization, the root node will be created and filled with the appropriate arguments.
         The `question` refers to the conclusion for which the tableau should generate (counter)arguments.
+        With `preprocess` (`'nnf'` or `'cnf'`), the conclusions of the arguments are converted to that normal form
+        (see `Proposition.to_normal_form`), which avoids the branching on `↔`.
+        The supports stay as they are, so the arguments still refer to the original information and rules.
+        With `relevant_only`, only the information and the rules that can matter for the question are used
+        (see `relevant_slice`); the others are kept in `dropped_information` and `dropped_rules`.
+        The arguments for and against the question are the same, but if the result is unknown,
+        the open branches only tell about the relevant variables.
+        The `budget` limits the resources that `evaluate` may use.
+        With `workers`, the first expansion of the tableau is shared by that many processes
+        (see `Node.expand_in_parallel`, where the `parallel_threshold` is explained).
         """
+        if preprocess not in (None, 'nnf', 'cnf'):
+            # The Tseitin transformation would introduce new variables, which have no meaning for the arguments.
+            raise ValueError('Unsupported normal form for the defeasible tableau: ' + str(preprocess))
+        self.preprocess = preprocess
+        self.budget = budget
+        self.workers = workers
+        self.parallel_threshold = parallel_threshold
+        self.dropped_information: List[Proposition] = []
+        self.dropped_rules: List[Rule] = []
+        information = initial_information
+        if relevant_only:
+            information, rules, self.dropped_information, self.dropped_rules = \
+                relevant_slice(question, initial_information, rules)
         self.root = Node(
             # `|` is the union operation on sets
             # Arguments for the initial information:
-            {Argument(set([p]), p) for p in initial_information}
+            {Argument(set([p]), p.to_normal_form(preprocess)) for p in information}
             # Tests for the final conclusion:
-            | {Argument(set([Test(Not(question))]), Not(question))}
+            | {Argument(set([Test(Not(question))]), Not(question).to_normal_form(preprocess))}
             # Tests for the antecedences of all rules:
             | {Argument(set([Test(Not(rule.antecedence))]),
-                        Not(rule.antecedence)) for rule in rules}
+                        Not(rule.antecedence).to_normal_form(preprocess)) for rule in rules}
         )
+        # The arguments of the root (and thus of the whole tree), indexed for step 4. of `evaluate`
+        self.arguments = self.root.store
         self.initial_information = initial_information
         self.rules = rules
         self.question = question
+        # For each test of the root: whether it is about the question, and the rules whose antecedence it is about
+        self.tested: Dict[Test, Tuple[bool, List[Rule]]] = {Test(Not(question)): (True, [])}
+        for rule in rules:
+            self.tested.setdefault(Test(Not(rule.antecedence)), (False, []))[1].append(rule)
 
     def evaluate(self) -> Tuple[str, Union[Set[FrozenSet[str]], Tuple[List[Argument], List[Argument]]]]:
         """
@@ -39,28 +76,57 @@ class Tableau:
             1. Expand the tableau as far as possible.
             2. Retrieve all arguments for the closure of the tableau.
             3. Convert them into constructive arguments.
-            4. Add them to all nodes (if they or more minimal ones are not already there).
+            4. Add them to all nodes (if they or more minimal ones are not already there),
+               and remove the arguments with the same conclusion and a bigger support.
             5. If new arguments could be created in the last step: Repeat from step 1.
         Then it retrieves all arguments for and against the `question` and returns them.
+        The rounds after the first are incremental: The tableau is only expanded as far as
+        the arguments added in the last round allow (see `Node.expand`), and only the arguments for the closure
+        that have not been seen in an earlier round are converted, since the others have been dealt with already.
+        If the tableau has a `budget`, and one of its limits is reached, the evaluation stops, and the arguments
+        for and against the `question` that have been found so far are returned, as `'partial'` instead of `'known'`.
+        The budget tells which limit that was (see `Budget.statistics`).
         """
+        budget = self.budget
+        if budget is not None:
+            budget.start()
+        executor = None
+        if self.workers is not None:
+            executor = concurrent.futures.ProcessPoolExecutor(self.workers)
         arguments_for_inconsistency: Set[Argument] = set()
-        while True:
-            self.root.expand()  # 1.
-            candidates = self.transform_arguments(
-                self.root.arguments_for_inconsistency())  # 2. & 3.
-            new_arguments: Set[Argument] = set()
-            # 4.:
-            for c in candidates:
-                exists_already = False
-                for old in self.root.arguments:
-                    if (c.conclusion == old.conclusion
-                            and set(old.support).issubset(set(c.support))):
-                        exists_already = True
-                if not exists_already:
-                    new_arguments.add(c)
-            self.root.add(new_arguments)  # 4.
-            if len(new_arguments) == 0:
-                break  # 5
+        new_arguments: Optional[Set[Argument]] = None
+        try:
+            while True:
+                if budget is not None:
+                    budget.spend(rounds=1)
+                # 1.:
+                if executor is not None and new_arguments is None:
+                    self.root.expand_in_parallel(executor, self.workers, self.parallel_threshold, budget)
+                else:
+                    self.root.expand(new=new_arguments, budget=budget)
+                inconsistencies = self.root.arguments_for_inconsistency()  # 2.
+                candidates = self.transform_arguments(
+                    inconsistencies - arguments_for_inconsistency)  # 3.
+                arguments_for_inconsistency |= inconsistencies
+                new_arguments = set()
+                # 4.:
+                # Smaller supports first, so that of the candidates, too, only the minimal ones are added.
+                for c in sorted(candidates, key=lambda c: len(c.support)):
+                    if not self.arguments.subsumes(c):
+                        self.root.discard(self.arguments.superseded_by(c))
+                        self.root.add({c})
+                        new_arguments.add(c)
+                if len(new_arguments) == 0:
+                    break  # 5
+        except BudgetExceeded:
+            pro, contra = self.root.arguments_for_and_against(self.question)
+            return 'partial', (sorted(list(pro)), sorted(list(contra)))
+        finally:
+            if budget is not None:
+                budget.stop()
+            if executor is not None:
+                # Subtrees that are still being expanded after a limit has been reached are not waited for.
+                executor.shutdown(wait=False)
         pro, contra = self.root.arguments_for_and_against(
             self.question)
         if len(pro) > 0 or len(contra) > 0:
@@ -84,29 +150,72 @@ class Tableau:
             a ~> d
         then it will create a constructive argument:
             ({b, ¬c}, a ~> d)           (2.)
+        The question and the rules that a test is about are looked up in `tested`.
         """
         new_arguments: Set[Argument] = set()
         for a in inconsistencies:
             tests: List[Test] = [p for p in a.support if isinstance(p, Test)]
             if len(tests) == 1:
                 test = tests[0]
-                support = {p for p in a.support if str(p) != str(test)}
+                support = {p for p in a.support if p != test}
+                about_question, rules = self.tested.get(test, (False, []))
                 # 1.:
-                if test.nonnegated_content() == self.question:
+                if about_question:
                     new_arguments.add(
                         Argument(support, test.nonnegated_content()))
                 # 2.:
-                for rule in self.rules:
-                    if rule.antecedence == test.nonnegated_content():
-                        new_arguments.add(
-                            Argument(
-                                set([Argument(support, rule)]),
-                                rule.consequence
-                            )
+                for rule in rules:
+                    new_arguments.add(
+                        Argument(
+                            set([Argument(support, rule)]),
+                            rule.consequence.to_normal_form(self.preprocess)
                         )
+                    )
             elif len(tests) == 0:
                 pass  # TODO deal with inconsistencies in the initial information
         return new_arguments
 
     def __str__(self):
         return str(self.root)
+
+
+def relevant_slice(question: Proposition, initial_information: Iterable[Proposition], rules: Iterable[Rule]) \
+        -> Tuple[List[Proposition], List[Rule], List[Proposition], List[Rule]]:
+    """
+    Splits the information and the rules into those that can matter for the question, and the others.
+    They are found backwards from the variables of the question, through a graph of the variables:
+        - A piece of information connects all of its variables with each other.
+        - A rule connects the variables of its consequence with those of its antecedence, but not the other way round:
+          What a rule concludes only matters if its consequence does.
+    Information and rules without variables (such as `⊥`, or a rule that concludes `⊥`) always matter.
+    Returns the relevant information and rules, and the other information and rules.
+    """
+    information = list(initial_information)
+    rules = list(rules)
+    # The information and rules that each variable leads to
+    leads_to: Dict[str, List[Union[Proposition, Rule]]] = {}
+    relevant: Set[Union[Proposition, Rule]] = set()
+    for item in information + rules:
+        names = (item.consequence if isinstance(item, Rule) else item).variables()
+        if len(names) == 0:
+            relevant.add(item)
+        for name in names:
+            leads_to.setdefault(name, []).append(item)
+    variables: Set[str] = set()
+    stack: List[str] = list(question.variables())
+    for item in relevant:
+        stack.extend(item.antecedence.variables() if isinstance(item, Rule) else ())
+    while len(stack) > 0:
+        name = stack.pop()
+        if name in variables:
+            continue
+        variables.add(name)
+        for item in leads_to.get(name, ()):
+            if item not in relevant:
+                relevant.add(item)
+                if isinstance(item, Rule):
+                    stack.extend(item.antecedence.variables() + item.consequence.variables())
+                else:
+                    stack.extend(item.variables())
+    return ([p for p in information if p in relevant], [r for r in rules if r in relevant],
+            [p for p in information if p not in relevant], [r for r in rules if r not in relevant])
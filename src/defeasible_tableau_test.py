@@ -2,7 +2,9 @@ from typing import *
 from defeasible_tableau import *
 from reasoning_elements import *
 from propositional_parser import *
+import pickle
 import pytest
+import tracemalloc
 
 # Run all tests with `poetry run pytest src`.
 # Annotate tests with `@skip` to skip them.
@@ -15,6 +17,20 @@ def str_list(l):
     return [str(a) for a in l]
 
 
+def nodes(tableau):
+    result = []
+    stack = [tableau.root]
+    while len(stack) > 0:
+        node = stack.pop()
+        result.append(node)
+        stack.extend(node.children)
+    return result
+
+
+def count_nodes(tableau):
+    return len(nodes(tableau))
+
+
 # SIMPLE TESTS
 
 def test_simple_nondefeasible_proposition():
@@ -82,6 +98,150 @@ def test_complex_nondefeasible_proposition():
     assert str_list(contra) == []
 
 
+def test_node_add():
+    a, b = parse('a'), parse('b')
+    conjunction = Argument({a}, parse('a ∧ b'))
+    root = Node({conjunction})
+    root.expand()
+    child = root.children[0]
+    assert child.removed is conjunction
+    assert child.arguments == {Argument({a}, a), Argument({a}, b)}
+    # Added arguments reach all descendants, even if one of them had removed it
+    root.add({conjunction, Argument({b}, b)})
+    # They are only added to the store that all nodes share.
+    assert root.added == () and len(child.added) == 2
+    assert child.arguments == {conjunction, Argument({a}, a),
+                               Argument({a}, b), Argument({b}, b)}
+
+
+def test_node_expand_new():
+    a, b, not_a = parse('a'), parse('b'), parse('¬a')
+    root = Node({Argument({parse('a ∨ b')}, parse('a ∨ b'))})
+    root.expand()
+    left, right = sorted(root.children, key=lambda child: str(child.added[0]))
+    # Only the branch with `a` can become inconsistent with a new argument for `¬a`.
+    new = {Argument({not_a}, not_a)}
+    root.add(new)
+    assert [node for node, _, _ in root.touched_by(new)] == [left]
+    root.expand(new=new)
+    assert str_list(left.children[0].added) == ['({a ∨ b, ¬a}, False)']
+    assert right.children == []
+
+
+def test_minimal_supports():
+    a, b, c = parse('a'), parse('b'), parse('c')
+    test = Test(parse('¬c'))
+    supports = [frozenset({a, b}), frozenset({a}), frozenset({a, c}), frozenset({b, c}),
+                frozenset({a, test}), frozenset({a, b, test}), frozenset({b, c, test})]
+    premises = Premises()
+    masks = [premises.mask(s) for s in supports]
+    # A support with a test is not left out for one without, since only the first gives a constructive argument.
+    assert {premises.support(m) for m in premises.minimal(masks)} == {
+        frozenset({a}), frozenset({b, c}), frozenset({a, test}), frozenset({b, c, test})}
+
+
+def test_premises():
+    a, not_a, b = parse('a'), parse('¬a'), parse('b')
+    premises = Premises()
+    ab = premises.mask(frozenset({a, b}))
+    test = premises.mask(frozenset({Test(not_a)}))
+    not_a_mask = premises.mask(frozenset({Argument({b}, not_a)}))
+    assert premises.support(ab | test) == frozenset({a, b, Test(not_a)})
+    assert premises.consistent(ab | test) and not premises.consistent(ab | not_a_mask)
+    assert premises.at_most_one_test(ab | test)
+    assert not premises.at_most_one_test(test | premises.mask(frozenset({Test(parse('¬b'))})))
+
+
+def test_inconsistencies_cache():
+    root = Node({Argument({parse('a ∨ b')}, parse('a ∨ b')),
+                 Argument({parse('¬a')}, parse('¬a'))})
+    root.expand()
+    assert root.arguments_for_inconsistency() == set()
+    assert root.inconsistency_masks() is root.inconsistencies_below
+    # Closing the other branch as well changes the result.
+    new = {Argument({parse('¬b')}, parse('¬b'))}
+    root.add(new)
+    root.expand(new=new)
+    assert str_list(root.arguments_for_inconsistency()) == ['({a ∨ b, ¬a, ¬b}, False)']
+
+
+def test_argument_store():
+    a, b, c = parse('a'), parse('b'), parse('c')
+    ab = Argument({a, b}, c)
+    abc = Argument({a, b, c}, c)
+    store = ArgumentStore([ab, abc, Argument({a}, b)])
+    assert store.subsumes(Argument({a, b, parse('d')}, c))
+    assert not store.subsumes(Argument({a, c}, c))
+    assert store.superseded_by(Argument({b}, c)) == {ab, abc}
+    assert store.superseded_by(Argument(set(), c)) == {ab, abc}
+    store.remove(ab)
+    assert ab not in store and len(store) == 2
+    assert not store.subsumes(Argument({a, b}, c))
+    assert store.superseded_by(Argument({a, b}, c)) == {abc}
+
+
+def test_superseded_arguments():
+    a, b, q = parse('a'), parse('b'), parse('q')
+    tableau = Tableau(question=q, initial_information=[a, b, parse('a → q')])
+    bigger = Argument({a, b, parse('a → q')}, q)
+    tableau.root.add({bigger})
+    _, (pro, _) = tableau.evaluate()
+    # The new argument for `q` has a smaller support, so it replaces the one that was there.
+    assert str_list(pro) == ['({a, a → q}, q)']
+    assert bigger not in tableau.root.arguments
+
+
+def test_literal_index():
+    a = Argument({parse('a')}, parse('a'))
+    not_a = Argument({parse('¬a')}, parse('¬a'))
+    b = Argument({parse('b')}, parse('b'))
+    not_true = Argument({parse('¬true')}, parse('¬true'))
+    index = literal_index([a, not_a, b])
+    assert index[parse('a')] == ([a], [not_a])
+    assert list(inconsistent_with(a, [a, not_a, b], index)) == [not_a]
+    assert list(inconsistent_with(b, [a, not_a, b], index)) == []
+    index = literal_index([a, b, not_true])
+    assert list(inconsistent_with(b, [a, b, not_true], index)) == [not_true]
+    assert list(inconsistent_with(not_true, [a, b, not_true], index)) == [a, b, not_true]
+    assert consistent([a, b]) and not consistent([a, b, not_a]) and not consistent([not_true])
+
+
+def test_preprocess():
+    for question, initial_information, expected in [
+            ('b', ['a ∧ (a → b)'], ['({a ∧ (a → b)}, b)']),
+            ('c', ['(a ∨ b) → c', 'a'], ['({(a ∨ b) → c, a}, c)'])]:
+        results = [Tableau(question=parse(question),
+                           initial_information=[parse(p) for p in initial_information],
+                           preprocess=preprocess).evaluate()
+                   for preprocess in [None, 'nnf']]
+        assert results[0] == results[1]
+        _, (pro, contra) = results[1]
+        assert str_list(pro) == expected and contra == []
+    # In negation normal form, the equivalence needs fewer branches, and the support is still the original one.
+    tableaux = [Tableau(question=parse('b'),
+                        initial_information=[parse('a ↔ b'), parse('a')],
+                        preprocess=preprocess)
+                for preprocess in [None, 'nnf']]
+    _, (pro, contra) = tableaux[1].evaluate()
+    assert str_list(pro) == ['({a, a ↔ b}, b)']
+    tableaux[0].evaluate()
+    assert count_nodes(tableaux[1]) < count_nodes(tableaux[0])
+    with pytest.raises(ValueError):
+        Tableau(question=parse('b'), preprocess='tseitin')
+
+
+def test_nary_disjunction():
+    # The disjunction forks into three branches at once.
+    tableau = Tableau(
+        question=parse('c'),
+        initial_information=[parse('a ∨ b ∨ c'), parse('¬a'), parse('¬b')]
+    )
+    _, (pro, contra) = tableau.evaluate()
+    assert str_list(pro) == ['({a ∨ b ∨ c, ¬a, ¬b}, c)']
+    assert str_list(contra) == []
+    assert any(len(node.children) == 3 for node in nodes(tableau))
+
+
 def test_apply_1_rule():
     tableau = Tableau(
         question=parse('b'),
@@ -147,7 +307,7 @@ def test_logic_example_1():
     )
     _, (pro, contra) = tableau.evaluate()
     assert str_list(pro) == [
-        '({({({p ∨ q, ¬q}, p ~> r), p ∨ q, ¬q}, r ~> s)}, s)',  # TODO
+        # Only the argument with the minimal support; `p ∨ q` and `¬q` are in the support of `p ~> r` already.
         '({({({p ∨ q, ¬q}, p ~> r)}, r ~> s)}, s)'
     ]
     assert str_list(contra) == []
@@ -265,7 +425,72 @@ def test_law_example():
     ]
 
 
-@skip
+def test_relevant_slice():
+    information = [parse(p) for p in ['Employed', '¬LessThanTenEmployees', 'MilitaryOfficial',
+                                      'WorkedForAtLeastTwentySixWeeks', 'Paid ∨ Volunteer']]
+    rules = [Rule(parse('Employed'), parse('CanMakeRequestForChange')),
+             Rule(parse('Employed & MilitaryOfficial'), parse('¬CanMakeRequestForChange')),
+             Rule(parse('LessThanTenEmployees'), parse('SmallCompany')),
+             # Not relevant, even though its antecedence is:
+             Rule(parse('Employed'), parse('Paid')),
+             Rule(parse('WorkedForAtLeastTwentySixWeeks'), parse('MilitaryOfficial'))]
+    question = parse('¬CanMakeRequestForChange')
+    sliced = Tableau(question, information, rules, relevant_only=True)
+    assert str_list(sliced.dropped_information) == ['¬LessThanTenEmployees', 'Paid ∨ Volunteer']
+    assert str_list(sliced.dropped_rules) == ['LessThanTenEmployees ~> SmallCompany', 'Employed ~> Paid']
+    assert sliced.evaluate() == Tableau(question, information, rules).evaluate()
+
+
+def law_example(budget: Budget = None) -> Tableau:
+    return Tableau(
+        initial_information=[parse(p) for p in ['Employed', '¬LessThanTenEmployees', 'MilitaryOfficial']],
+        rules=[Rule(parse('Employed'), parse('CanMakeRequestForChange')),
+               Rule(parse('Employed & MilitaryOfficial'), parse('¬CanMakeRequestForChange'))],
+        question=parse('¬CanMakeRequestForChange'),
+        budget=budget)
+
+
+def test_budget():
+    flag, (pro, contra) = law_example().evaluate()
+    assert flag == 'known' and len(pro) == 1 and len(contra) == 1
+    # The arguments are found in the first round; the second one only finds that there are no more.
+    budget = Budget(rounds=1)
+    assert law_example(budget).evaluate() == ('partial', (pro, contra))
+    assert budget.statistics()['exceeded'] == 'rounds'
+    assert budget.statistics()['rounds'] == 2
+    budget = Budget(nodes=1)
+    assert law_example(budget).evaluate() == ('partial', ([], []))
+    assert budget.exceeded == 'nodes' and budget.used['nodes'] == 2
+    budget = Budget(seconds=0)
+    assert law_example(budget).evaluate()[0] == 'partial' and budget.exceeded == 'seconds'
+    budget = Budget(memory=1)
+    assert law_example(budget).evaluate()[0] == 'partial' and budget.exceeded == 'memory'
+    assert not tracemalloc.is_tracing()
+    budget = Budget(seconds=60, nodes=1000, rounds=10, memory=1 << 30)
+    assert law_example(budget).evaluate() == ('known', (pro, contra))
+    assert budget.exceeded is None
+
+
+def test_pickle_node():
+    root = Node({Argument({parse('(a ∨ b) ∧ (¬a) ∧ (¬b)')}, parse('(a ∨ b) ∧ (¬a) ∧ (¬b)'))})
+    root.expand()
+    copy = pickle.loads(pickle.dumps(root.children[0]))
+    # The copy is a root with the arguments of the node, and the same subtree.
+    assert copy.parent is None and copy.arguments == root.children[0].arguments
+    assert str(copy) == root.children[0].__str__('', set(), root.children[0].arguments)
+    assert copy.arguments_for_inconsistency() == root.arguments_for_inconsistency()
+
+
+def test_parallel():
+    serial = law_example().evaluate()
+    tableau = law_example()
+    tableau.workers = 2
+    tableau.parallel_threshold = 1
+    assert tableau.evaluate() == serial
+    # The subtrees from the workers are grafted onto the tableau.
+    assert all(node.store is tableau.arguments for node in nodes(tableau))
+
+
 def test_law_example_2():
     """
     Tomas Cremers, Appendix C.2
@@ -339,17 +564,16 @@ def test_law_example_2():
         (5, 3),
 
     ]
-    pro, contra = tableau.evaluate()
-    print(pro)
-    print(contra)
+    _, (pro, contra) = tableau.evaluate()
     assert str_list(pro) == [
-        '({{Employed}, Employed ~> CanMakeRequestForChange)} CanMakeRequestForChange ~> LEGAL_RequestedChangeWorkingHours)'
+        '({({({Employed}, Employed ~> CanMakeRequestForChange), DOES_RequestChangeWorkingHours}, '
+        'CanMakeRequestForChange ∧ DOES_RequestChangeWorkingHours ~> LEGAL_RequestedChangeWorkingHours)}, '
+        'LEGAL_RequestedChangeWorkingHours)'
     ]
     assert str_list(contra) == []
 
 # Information from open branches
 
-@skip
 def test_unknown_information():
     tableau = Tableau(
         question=parse('b'),
@@ -357,9 +581,9 @@ def test_unknown_information():
             parse('a -> b')
         ]
     )
-    assert tableau.get_undecided_propositions() == {
+    assert tableau.evaluate() == ('unknown', {
         frozenset({'a', 'b'})
-    }
+    })
 
     tableau = Tableau(
         question=parse('c'),
@@ -367,10 +591,10 @@ def test_unknown_information():
             parse('(a and b) -> c')
         ]
     )
-    assert tableau.get_undecided_propositions() == {
+    assert tableau.evaluate() == ('unknown', {
         frozenset({'a', 'c'}),
         frozenset({'b', 'c'})
-    }
+    })
 
     tableau = Tableau(
         question=parse('c'),
@@ -378,9 +602,9 @@ def test_unknown_information():
             parse('(a or b) -> c')
         ]
     )
-    assert tableau.get_undecided_propositions() == {
+    assert tableau.evaluate() == ('unknown', {
         frozenset({'a', 'b', 'c'})
-    }
+    })
 
     tableau = Tableau(
         question=parse('d'),
@@ -388,10 +612,10 @@ def test_unknown_information():
             parse('((a or b) and c) -> d')
         ]
     )
-    assert tableau.get_undecided_propositions() == {
+    assert tableau.evaluate() == ('unknown', {
         frozenset({'a', 'b', 'd'}),
         frozenset({'c', 'd'})
-    }
+    })
 
     tableau = Tableau(
         question=parse('d'),
@@ -400,12 +624,12 @@ def test_unknown_information():
             parse('e -> f')
         ]
     )
-    assert tableau.get_undecided_propositions() == {
+    assert tableau.evaluate() == ('unknown', {
         frozenset({'a', 'b', 'e', 'd'}),
         frozenset({'a', 'b', 'f', 'd'}),
         frozenset({'c', 'e', 'd'}),
         frozenset({'c', 'f', 'd'})
-    }
+    })
 
     tableau = Tableau(
         question=parse('d'),
@@ -414,10 +638,10 @@ def test_unknown_information():
             parse('x -> ((a and b) and c)')
         ]
     )
-    assert tableau.get_undecided_propositions() == {
+    assert tableau.evaluate() == ('unknown', {
         frozenset({'a', 'b', 'x', 'd'}),
         frozenset({'c', 'x', 'd'})
-    }
+    })
 
 '''
 ##British Nationality Act
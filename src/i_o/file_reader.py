@@ -1,5 +1,7 @@
 from propositional_parser import toProposition
 from reasoning_elements.rule import Rule
+from typing import *
+import contextlib
 import json
 
 
@@ -16,24 +18,176 @@ class Configuration:
                 print(line)
 
     def parse_json(self, filename):
+        """
+        Returns the rules and the facts of all rule sets in the file.
+        """
         rules = []
         facts = []
+        for _, item in self.iter_rule_base(filename):
+            if isinstance(item, self.Rule):
+                rules.append(item)
+            else:
+                facts.append(item)
+        return rules, facts
 
-        with open(filename, encoding='utf-8') as json_file:
-            data = json.load(json_file)
+    def load_rule_sets(self, filename, file: IO[str] = None) -> Dict[str, Tuple[list, list]]:
+        """
+        Returns the rules and the facts of each rule set in the file, by the name of the rule set.
+        """
+        rule_sets: Dict[str, Tuple[list, list]] = {}
+        for name, item in self.iter_rule_base(filename, file):
+            rules, facts = rule_sets.setdefault(name, ([], []))
+            if isinstance(item, self.Rule):
+                rules.append(item)
+            else:
+                facts.append(item)
+        return rule_sets
 
-            for set in data:
+    def iter_rule_base(self, filename, file: IO[str] = None) -> Iterator[Tuple[str, Any]]:
+        """
+        Reads a rule base incrementally, from a `.jsonl` file (see `iter_jsonl`) or else from a JSON file (see `iter_json`).
+        Yields pairs of the name of a rule set and a rule or fact from it.
+        Equal formulas are parsed only once (`parse` caches its results),
+        and equal subformulas are shared (propositions are interned).
+        If a `file` that is already open is given, the rule base is read from it, and `filename` only determines the format.
+        """
+        if str(filename).endswith('.jsonl'):
+            return self.iter_jsonl(filename, file)
+        else:
+            return self.iter_json(filename, file)
 
-                rules_data = data[set]["rules"]
-                facts_data = data[set]["facts"]
+    def iter_json(self, filename, file: IO[str] = None) -> Iterator[Tuple[str, Any]]:
+        """
+        Reads a JSON file of the form
+            {"<rule set>": {"rules": {"<rule>": {"antecedence": "...", "consequence": "..."}, ...},
+                            "facts": ["...", ...]},
+             ...}
+        incrementally: Only one rule or fact at a time is decoded, so the file never needs to be in memory as a whole.
+        Other entries (such as `"meta": 1` next to the rule sets) are ignored.
+        """
+        with opened(filename, file) as json_file:
+            for path, value in JSONStream(json_file).walk(depth=3):
+                if len(path) != 3:
+                    continue
+                name, section, _ = path
+                if section == 'rules':
+                    yield name, self.to_rule(value)
+                elif section == 'facts':
+                    yield name, self.toProposition(value)
 
-                rules = [self.Rule(self.toProposition(rules_data[rule]["antecedence"].encode('utf-8').decode('utf-8')),
-                                   self.toProposition(rules_data[rule]["consequence"].encode('utf-8').decode('utf-8'))) for rule in rules_data]
+    def iter_jsonl(self, filename, file: IO[str] = None) -> Iterator[Tuple[str, Any]]:
+        """
+        Reads a JSON Lines file, where each line is either a rule:
+            {"set": "<rule set>", "antecedence": "...", "consequence": "..."}
+        or a fact:
+            {"set": "<rule set>", "fact": "..."}
+        """
+        with opened(filename, file) as jsonl_file:
+            for line in jsonl_file:
+                if line.strip() == '':
+                    continue
+                data = json.loads(line)
+                if 'fact' in data:
+                    yield data['set'], self.toProposition(data['fact'])
+                else:
+                    yield data['set'], self.to_rule(data)
 
-                for fact_data in facts_data:
-                    facts.append(self.toProposition(fact_data))
+    def to_rule(self, data):
+        return self.Rule(self.toProposition(data["antecedence"]),
+                         self.toProposition(data["consequence"]))
 
-                facts = [self.toProposition(fact_data)
-                         for fact_data in facts_data]
 
-        return rules, facts
+def opened(filename, file: IO[str] = None) -> ContextManager[IO[str]]:
+    """
+    Opens the file, unless it is open already (then it is left open).
+    """
+    if file is None:
+        return open(filename, encoding='utf-8')
+    return contextlib.nullcontext(file)
+
+
+class JSONStream:
+    """
+    Reads a JSON document from a file chunk by chunk.
+    """
+
+    def __init__(self, file, chunk_size: int = 1 << 16):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.position = 0
+        self.at_end = False
+        self.decoder = json.JSONDecoder()
+
+    def walk(self, depth: int, path: Tuple = ()) -> Iterator[Tuple[Tuple, Any]]:
+        """
+        Yields the values at the given nesting depth as pairs of their path
+        (the keys and indices leading to them) and the decoded value.
+        Values higher up that are not objects or arrays are yielded as well.
+        """
+        char = self.peek()
+        if len(path) == depth or char not in '{[':
+            yield path, self.read_value()
+            return
+        closing = '}' if char == '{' else ']'
+        self.position += 1
+        if self.peek() == closing:
+            self.position += 1
+            return
+        index = 0
+        while True:
+            if char == '{':
+                key = self.read_value()
+                self.expect(':')
+            else:
+                key = index
+                index += 1
+            yield from self.walk(depth, path + (key,))
+            separator = self.peek()
+            self.position += 1
+            if separator == closing:
+                return
+            elif separator != ',':
+                raise ValueError('Invalid JSON: expected "," or "'
+                                 + closing + '" but got "' + separator + '"')
+
+    def read_value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+                # A number that reaches the end of the buffer, or that is followed by a character that could
+                # belong to it (such as "4" in "4.5"), may continue in the next chunk.
+                if ((end < len(self.buffer) and self.buffer[end] not in '.eE+-0123456789')
+                        or self.at_end):
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.at_end:
+                    raise
+            self.read_chunk()
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError('Invalid JSON: expected "' + char + '"')
+        self.position += 1
+
+    def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character.
+        """
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position].isspace():
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if self.at_end:
+                raise ValueError('Invalid JSON: unexpected end of file')
+            self.read_chunk()
+
+    def read_chunk(self):
+        # The part of the buffer that has already been read is dropped.
+        chunk = self.file.read(self.chunk_size)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        self.at_end = len(chunk) == 0
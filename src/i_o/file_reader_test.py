@@ -0,0 +1,65 @@
+from i_o.file_reader import Configuration, JSONStream
+from propositional_parser import toProposition, parse
+from reasoning_elements.rule import Rule
+import io
+import json
+import os
+
+sample_rule_sets = os.path.join(os.path.dirname(__file__), '..', 'sample_rule_sets')
+
+
+def test_all_rule_sets_are_kept(tmp_path):
+    filename = tmp_path / 'rules.json'
+    filename.write_text(json.dumps({
+        'first': {'rules': {'1': {'antecedence': 'a & b', 'consequence': 'c'}},
+                  'facts': ['a']},
+        'second': {'rules': {'1': {'antecedence': 'c', 'consequence': '¬d'},
+                             '2': {'antecedence': 'a & b', 'consequence': 'd'}},
+                   'facts': []},
+    }), encoding='utf-8')
+    config = Configuration(Rule, toProposition)
+    rule_sets = config.load_rule_sets(filename)
+    assert list(rule_sets.keys()) == ['first', 'second']
+    assert rule_sets['first'] == ([Rule(parse('a & b'), parse('c'))], [parse('a')])
+    assert [str(r) for r in rule_sets['second'][0]] == ['c ~> ¬d', 'a ∧ b ~> d']
+    rules, facts = config.parse_json(filename)
+    assert len(rules) == 3 and facts == [parse('a')]
+    # Equal subformulas are shared
+    assert rule_sets['first'][0][0].antecedence is rule_sets['second'][0][1].antecedence
+
+
+def test_other_entries_are_ignored(tmp_path):
+    filename = tmp_path / 'rules.json'
+    filename.write_text(json.dumps({
+        'meta': 1,
+        'first': {'rules': {'1': {'antecedence': 'a', 'consequence': 'b'}},
+                  'facts': ['a'], 'version': 2},
+    }), encoding='utf-8')
+    rule_sets = Configuration(Rule, toProposition).load_rule_sets(filename)
+    assert rule_sets == {'first': ([Rule(parse('a'), parse('b'))], [parse('a')])}
+
+
+def test_json_and_jsonl_agree(tmp_path):
+    config = Configuration(Rule, toProposition)
+    filename = os.path.join(sample_rule_sets, 'british_national_act.json')
+    with open(filename, encoding='utf-8') as json_file:
+        data = json.load(json_file)
+    lines = [json.dumps({'set': name, 'antecedence': rule['antecedence'],
+                         'consequence': rule['consequence']})
+             for name, rule_set in data.items()
+             for rule in rule_set['rules'].values()]
+    jsonl = tmp_path / 'rules.jsonl'
+    jsonl.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    from_json = list(config.iter_rule_base(filename))
+    assert len(from_json) == 13
+    assert from_json == list(config.iter_rule_base(jsonl))
+
+
+def test_json_stream_small_chunks():
+    document = {'a': {'b': [1, 23, {'c': 'd'}], 'e': 4.5}, 'f': [], 'g': None}
+    for chunk_size in [1, 2, 7, 1000]:
+        stream = JSONStream(io.StringIO(json.dumps(document, indent=2)), chunk_size)
+        assert list(stream.walk(depth=2)) == [
+            (('a', 'b'), [1, 23, {'c': 'd'}]),
+            (('a', 'e'), 4.5),
+            (('g',), None)]
@@ -0,0 +1,187 @@
+from i_o.file_reader import Configuration
+from propositional_parser import toProposition
+from reasoning_elements.proposition import *
+from reasoning_elements.rule import Rule
+from typing import *
+import hashlib
+import io
+import marshal
+import os
+import struct
+
+"""
+A compiled on-disk cache for parsed rule bases (see `Configuration.load_rule_sets`).
+
+The cache of `path/to/rules.json` is stored in `path/to/__rulecache__/rules.json.rbc`,
+or in another cache directory if one is given.
+It starts with a header: a magic number with the format version, the modification time, size
+and SHA-256 hash of the source file. The rest is the rule base, serialized with `marshal`:
+    - the proposition DAG as a list of nodes, where every node refers to its children by their position in the list,
+      so that shared subformulas are stored (and rebuilt) only once,
+    - the rule sets, where rules and facts refer to the nodes.
+The cache is used if the modification time and size of the source match the header,
+or else if the hash of its contents does. Otherwise it is rebuilt.
+The rule base is always read with the default `Configuration` (with `Rule` and `toProposition`),
+since that is what the cache contains.
+"""
+
+MAGIC = b'RBC1'
+HEADER = struct.Struct('<4sQQ32s')
+
+# The proposition classes that can occur in a cache, by name.
+classes: Dict[str, type] = {cls.__name__: cls for cls in
+                            [Variable, T, F, And, Or, Implies, Equiv, Not]}
+
+
+def load_rule_base(filename, cache_directory=None) -> Dict[str, Tuple[List[Rule], List[Proposition]]]:
+    """
+    Returns the rules and the facts of each rule set in the file, by the name of the rule set,
+    from the cache if it is up to date, and otherwise by parsing the file and updating the cache.
+    Raises `FileNotFoundError` if there is no such file.
+    """
+    cache = cache_path(filename, cache_directory)
+    rule_sets = read_cache(cache, filename, os.stat(filename))
+    if rule_sets is None:
+        with open(filename, 'rb') as file:
+            # The modification time and size that are recorded are those from before reading,
+            # so if the file changes while it is read, the next load will notice it.
+            stat = os.fstat(file.fileno())
+            reader = DigestReader(file)
+            text = io.TextIOWrapper(io.BufferedReader(reader), encoding='utf-8')
+            rule_sets = Configuration(Rule, toProposition) \
+                .load_rule_sets(filename, text)
+            # The hash is taken from exactly the bytes that were parsed.
+            digest = reader.finish()
+        write_cache(cache, stat, digest, encode(rule_sets))
+    return rule_sets
+
+
+def read_cache(cache: str, filename, stat: os.stat_result) -> Optional[Dict[str, Tuple[List[Rule], List[Proposition]]]]:
+    """
+    Returns the cached rule base, or `None` if there is no valid cache.
+    """
+    try:
+        with open(cache, 'rb') as file:
+            data = file.read()
+        magic, mtime, size, cached_digest = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            return None
+        digest = None
+        if (mtime, size) != (stat.st_mtime_ns, stat.st_size):
+            digest = file_digest(filename)
+            if digest != cached_digest:
+                return None
+        with memoryview(data) as view, view[HEADER.size:] as payload:
+            rule_sets = decode(marshal.loads(payload))
+    except (OSError, ValueError, EOFError, TypeError, IndexError, KeyError, struct.error):
+        # Missing or corrupt cache
+        return None
+    if digest is not None:
+        # The contents are the same, but the file was touched.
+        # Updating the header means that the next load does not need to hash the file.
+        write_cache(cache, stat, digest, encode(rule_sets))
+    return rule_sets
+
+
+def cache_path(filename, cache_directory=None) -> str:
+    directory, name = os.path.split(os.path.abspath(filename))
+    if cache_directory is None:
+        cache_directory = os.path.join(directory, '__rulecache__')
+    return os.path.join(cache_directory, name + '.rbc')
+
+
+def file_digest(filename) -> bytes:
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+class DigestReader(io.RawIOBase):
+    """
+    Reads a binary file and hashes everything that is read from it.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.digest = hashlib.sha256()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = self.file.readinto(buffer)
+        with memoryview(buffer) as view:
+            self.digest.update(view[:count])
+        return count
+
+    def finish(self) -> bytes:
+        """
+        Hashes the rest of the file, which the parser did not need to read, and returns the hash.
+        """
+        for chunk in iter(lambda: self.file.read(1 << 20), b''):
+            self.digest.update(chunk)
+        return self.digest.digest()
+
+
+def write_cache(cache: str, stat: os.stat_result, digest: bytes, payload: bytes):
+    """
+    Writes the cache atomically. If the directory is not writable, there will just be no cache.
+    """
+    try:
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        temporary = cache + '.' + str(os.getpid()) + '.tmp'
+        with open(temporary, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, stat.st_mtime_ns,
+                                   stat.st_size, digest))
+            file.write(payload)
+        os.replace(temporary, cache)
+    except OSError:
+        pass
+
+
+def encode(rule_sets: Dict[str, Tuple[List[Rule], List[Proposition]]]) -> bytes:
+    nodes: List[tuple] = []
+    index: Dict[Proposition, int] = {}
+
+    def add(proposition: Proposition) -> int:
+        # Children are added before their parents, without recursion.
+        stack = [proposition]
+        while len(stack) > 0:
+            p = stack[-1]
+            if p in index:
+                stack.pop()
+                continue
+            cls, args = p.__reduce__()
+            missing = [a for a in args
+                       if isinstance(a, Proposition) and a not in index]
+            if len(missing) > 0:
+                stack.extend(reversed(missing))
+                continue
+            stack.pop()
+            index[p] = len(nodes)
+            nodes.append((cls.__name__,) + tuple(
+                index[a] if isinstance(a, Proposition) else a for a in args))
+        return index[proposition]
+
+    encoded = [(name,
+                [(add(r.antecedence), add(r.consequence), r.defeasible_level)
+                 for r in rules],
+                [add(f) for f in facts])
+               for name, (rules, facts) in rule_sets.items()]
+    return marshal.dumps((nodes, encoded))
+
+
+def decode(data) -> Dict[str, Tuple[List[Rule], List[Proposition]]]:
+    nodes, encoded = data
+    propositions: List[Proposition] = []
+    for name, *args in nodes:
+        if name == 'Variable':
+            propositions.append(Variable(*args))
+        else:
+            propositions.append(
+                classes[name](*[propositions[i] for i in args]))
+    return {name: ([Rule(propositions[a], propositions[c], level) for a, c, level in rules],
+                   [propositions[f] for f in facts])
+            for name, rules, facts in encoded}
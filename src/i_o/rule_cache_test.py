@@ -0,0 +1,65 @@
+from i_o.file_reader import Configuration
+from i_o.rule_cache import load_rule_base, cache_path
+from decision_support_system import DecisionSupportSystem
+from propositional_parser import parse
+import json
+import os
+import pytest
+import shutil
+
+sample_rule_sets = os.path.join(os.path.dirname(__file__), '..', 'sample_rule_sets')
+
+
+def test_cache(tmp_path, monkeypatch):
+    filename = tmp_path / 'cremers_example.json'
+    shutil.copy(os.path.join(sample_rule_sets, 'cremers_example.json'), filename)
+    parsed = Configuration.load_rule_sets
+    calls = []
+    monkeypatch.setattr(Configuration, 'load_rule_sets',
+                        lambda self, f, *args: calls.append(f) or parsed(self, f, *args))
+
+    first = load_rule_base(filename)
+    assert len(calls) == 1 and os.path.exists(cache_path(filename))
+    # Loaded from the cache:
+    assert load_rule_base(filename) == first
+    # Touched, but the same contents:
+    os.utime(filename, ns=(0, 0))
+    assert load_rule_base(filename) == first
+    assert len(calls) == 1
+
+    # Changed contents:
+    data = json.loads(filename.read_text(encoding='utf-8'))
+    data['Thomas Cremers Example']['facts'] = ['EmployedAt']
+    filename.write_text(json.dumps(data), encoding='utf-8')
+    os.utime(filename, ns=(0, 0))
+    second = load_rule_base(filename)
+    assert len(calls) == 2
+    assert second['Thomas Cremers Example'][1] == [parse('EmployedAt')]
+    assert second['Thomas Cremers Example'][0] == first['Thomas Cremers Example'][0]
+
+
+def test_corrupt_cache(tmp_path):
+    filename = tmp_path / 'british_national_act.json'
+    shutil.copy(os.path.join(sample_rule_sets, 'british_national_act.json'), filename)
+    expected = load_rule_base(filename)
+    with open(cache_path(filename), 'r+b') as cache:
+        cache.truncate(60)
+    assert load_rule_base(filename) == expected
+
+
+def test_cache_directory(tmp_path):
+    filename = os.path.join(sample_rule_sets, 'british_national_act.json')
+    expected = load_rule_base(filename, tmp_path)
+    assert os.path.exists(tmp_path / 'british_national_act.json.rbc')
+    assert load_rule_base(filename, tmp_path) == expected
+    with pytest.raises(FileNotFoundError):
+        load_rule_base(tmp_path / 'missing.json', tmp_path)
+
+
+def test_decision_support_system_from_rule_base(tmp_path):
+    filename = tmp_path / 'british_national_act.json'
+    shutil.copy(os.path.join(sample_rule_sets, 'british_national_act.json'), filename)
+    dss = DecisionSupportSystem.from_rule_base(
+        filename, parse('BritishCitizen'), 'British National Act')
+    assert len(dss.rules) == 13
+    assert dss.initial_information == set()
@@ -1,5 +1,6 @@
 from reasoning_elements.proposition import *
 from lark import Lark, Transformer, v_args, Tree
+import functools
 
 logic_grammar = r"""
     ?start  : exp | complex
@@ -38,11 +39,8 @@ class TreeToJson2(Transformer):
         return a
 
     def nary(self, *a):
-        a = list(a)
-        if len(a) == 1:
-            return a[0]
-        else:
-            return self.ops[a[1].data](a[0], self.nary(*a[2:]))
+        # The operands and operators alternate, and all operators are the same (see the grammar).
+        return self.ops[a[1].data](*a[::2])
 
     def binary(self, a, op, b):
         return self.ops[op.data](a, b)
@@ -64,11 +62,21 @@ class TreeToJson2(Transformer):
         return Variable(a)
 
 
+# Building the parser (grammar analysis and LALR table construction) is expensive,
+# so it is done only once, when the module is loaded.
+parser = Lark(logic_grammar,
+              parser='lalr',
+              transformer=TreeToJson2()
+              )
+
+
+@functools.lru_cache(maxsize=4096)
 def parse(a):
-    return Lark(logic_grammar,
-                parser='lalr',
-                transformer=TreeToJson2()
-                ).parse(a)
+    """
+    Parses a string into a proposition.
+    The results are cached, which is safe because propositions are immutable.
+    """
+    return parser.parse(a)
 
 def toProposition(a):
     if type(a) is str:
@@ -4,4 +4,4 @@ from propositional_parser import parse
 def test():
     assert (str(parse(
         '¬(~((1 ∨ (q ∧ r and (((no))) ^ C)) equiv   ((p v q or z) <- ((p ∨ r) imp 0))))'))
-        == '¬¬((True ∨ (q ∧ (r ∧ (False ∧ C)))) ↔ (((p ∨ r) → False) → (p ∨ (q ∨ z))))')
+        == '¬¬(True ↔ (((p ∨ r) → False) → (p ∨ q ∨ z)))')
@@ -1,6 +1,8 @@
 from reasoning_elements.proposition import *
 from propositional_parser import toProposition
-from typing import Tuple, List
+import sat_solver
+from typing import Tuple, List, Union, Optional, Dict, Set
+from collections import deque
 
 """
 Note that the propositional tableau has its own Node data structure, which is also found in its file.
@@ -8,34 +10,118 @@ There is another Node data structure in `reasoning_elements/node.py`, but that o
 The difference is that this one is a set of propositions, and the other one is a set of arguments.
 """
 
-def is_valid(proposition) -> bool:
+# With `engine='auto'`, propositions with more distinct subpropositions than this are checked with the SAT solver.
+AUTO_ENGINE_SIZE = 50
+
+
+def is_valid(proposition, engine: str = 'auto', preprocess: str = None) -> bool:
     """
     Checks whether an argument is valid:
     Whether the conclusion holds in every possible situation, given the support.
+    See `find_model` for the engines.
     """
-    tableau = Tableau(Not(toProposition(proposition)))
-    return tableau.is_invalid()
+    return find_counterexample(proposition, engine, preprocess) is None
 
 
-def is_satisfiable(proposition) -> bool:
+def is_satisfiable(proposition, engine: str = 'auto', preprocess: str = None) -> bool:
     """
     Checks whether a proposition is satisfiable:
     Whether it is true in at least one possible situation, given the support.
+    See `find_model` for the engines.
+    """
+    return find_model(proposition, engine, preprocess) is not None
+
+
+def find_model(proposition, engine: str = 'auto', preprocess: str = None) -> Optional[Dict[str, bool]]:
+    """
+    Returns a model in which the proposition is true, or `None` if there is none.
+    The engine is either
+        - `'tableau'`: searches the tableau for an open branch,
+        - `'cdcl'`: the SAT solver in `sat_solver.py`, which can handle much bigger propositions, or
+        - `'auto'`: the tableau for small propositions, and the SAT solver for big ones (see `AUTO_ENGINE_SIZE`).
+    The tableau can be built for a normal form of the proposition (see `preprocess` in `Tableau`).
+    """
+    proposition = toProposition(proposition)
+    if engine == 'auto':
+        engine = 'tableau' if len(proposition.subpropositions()) <= AUTO_ENGINE_SIZE else 'cdcl'
+    if engine == 'tableau':
+        return Tableau(proposition, preprocess=preprocess).find_model()
+    elif engine == 'cdcl':
+        return sat_solver.find_model(proposition)
+    else:
+        raise ValueError('Unknown engine: ' + str(engine))
+
+
+def find_counterexample(proposition, engine: str = 'auto', preprocess: str = None) -> Optional[Dict[str, bool]]:
+    """
+    Returns a model in which the proposition is false, or `None` if it is valid.
+    """
+    return find_model(Not(toProposition(proposition)), engine, preprocess)
+
+
+def is_inconsistent(propositions: List[Proposition], new_propositions: List[Proposition]) -> bool:
     """
-    tableau = Tableau(toProposition(proposition))
-    return not tableau.is_invalid()
+    Checks whether one of the new simple propositions contradicts a simple proposition in `propositions`
+    (which include the new ones), or is false by itself (`⊥` or `¬⊤`).
+    """
+    simple = {p for p in propositions if not p.is_decomposable()}
+    for p in new_propositions:
+        if p in simple:
+            if Not(p) in simple or (isinstance(p, Not) and p.children[0] in simple):
+                return True
+            if p == F() or p == Not(T()):
+                return True
+    return False
 
 
 class Tableau:
+    """
+    A tableau is expanded lazily:
+    `find_model` and `is_invalid` only expand branches until the answer is known,
+    while `expand` (and printing the tableau) expands all of it.
+    """
     root: 'Node'
 
-    def __init__(self, proposition):
-        self.root = Node([toProposition(proposition)])
-        self.root.expandRecursively()
+    proposition: Proposition
+
+    breadth_first: bool
+
+    def __init__(self, proposition, breadth_first: bool = False, preprocess: str = None):
+        """
+        With `preprocess`, the tableau is built for a normal form of the proposition (see `Proposition.to_normal_form`).
+        The negation normal form (`'nnf'`) has no `↔`, whose decomposition repeats its subpropositions,
+        and often gives much smaller tableaux.
+        """
+        self.proposition = toProposition(proposition)
+        self.root = Node([self.proposition.to_normal_form(preprocess)])
+        self.breadth_first = breadth_first
 
     def __str__(self):
+        self.expand()
         return str(self.root)
 
+    def expand(self):
+        """
+        Expands the whole tableau.
+        """
+        self.root.expandRecursively(self.breadth_first)
+
+    def find_model(self) -> Optional[Dict[str, bool]]:
+        """
+        Searches for an open branch depth-first, and returns the model that it describes, or `None` if all branches close.
+        The model has a truth value for every variable of the proposition;
+        variables that don't occur on the branch can have any value, and are false.
+        """
+        leaf = self.root.find_open_branch()
+        if leaf is None:
+            return None
+        model = {name: False for name in self.proposition.variables()}
+        for p in leaf.propositions:
+            # New variables from the Tseitin transformation are left out.
+            if isinstance(p, Variable) and p.name in model:
+                model[p.name] = True
+        return model
+
     def is_invalid(self) -> bool:
         return self.root.is_invalid()
 
@@ -45,49 +131,113 @@ class Node:
     Node of a propositional tableau.
     Can be expanded, and then it may have child nodes.
     """
-    arguments: List[Proposition]
+    __slots__ = ('parent', 'added', 'removed', 'children', 'closed', 'expanded')
+
+    parent: Optional['Node']
+
+    added: List[Proposition]
+
+    removed: Optional[Proposition]
 
     children: List['Node']
 
     closed: bool
 
-    def __init__(self, propositions: List[Proposition]):
-        self.propositions = propositions
+    expanded: bool
+
+    def __init__(self, propositions: List[Proposition], parent: 'Node' = None, removed: Proposition = None,
+                 parent_propositions: List[Proposition] = None):
+        """
+        Creates a node with the propositions of the parent node (if any), except for the `removed` one,
+        followed by the given propositions.
+        The node only stores the propositions that it adds and the one it removes (see `propositions`),
+        so the propositions of a branch are shared by all its nodes rather than copied.
+        If the propositions of the parent are known already, they can be passed, so that they need not be derived again.
+        Only the new propositions are checked for inconsistencies with the others, since the parent was consistent.
+        """
+        self.parent = parent
+        self.added = propositions
+        self.removed = removed
         self.children = []
-        self.closed = False
+        self.closed = is_inconsistent(
+            self.propositions if parent_propositions is None else self.apply(parent_propositions),
+            propositions)
+        self.expanded = False
+
+    @property
+    def propositions(self) -> List[Proposition]:
+        """
+        The propositions of the node, derived from the changes made by the node and its ancestors.
+        A proposition added by an ancestor is kept unless a node further down the branch removes it.
+        """
+        propositions: List[Proposition] = []
+        removed_below: Set[Proposition] = set()
+        node: Optional[Node] = self
+        while node is not None:
+            propositions.extend(p for p in reversed(node.added)
+                                if p not in removed_below)
+            if node.removed is not None:
+                removed_below.add(node.removed)
+            node = node.parent
+        propositions.reverse()
+        return propositions
+
+    def apply(self, parent_propositions: List[Proposition]) -> List[Proposition]:
+        """
+        Returns the propositions of the node, given the propositions of its parent.
+        """
+        return [p for p in parent_propositions if p != self.removed] + self.added
 
     def __str__(self, indent='', parentPropositions=[]):
         """
         Stringifies a node and its child nodes in the shape of a tree.
         Optional arguments:
-        - An indent. For the tree shape, every node will just call the string method of its child nodes, with a bigger indent.
+        - An indent. For the tree shape, every node will be printed with a bigger indent than its parent.
         - The propositions of the parent. These will be ignored for the output string, since they would be redundant.
         Multiple propositions within one node will be printed in consecutive lines.
         Multiple nodes are separated by a blank line.
+        The tree is traversed with an explicit stack rather than by recursion, so that deep tableaux can be printed.
         """
-        propositions = [str(p) for p in self.propositions]
-        return (indent
-                + ('\n' + indent).join([p for p in propositions
-                                        if p not in parentPropositions])
-                + '\n'
-                + (indent + '❌\n' if self.closed else "")
-                + '\n'.join([child.__str__(indent + '    ', propositions) for child in self.children]))
+        output: List[str] = []
+        # The stack holds nodes that still need to be printed (with their indent and parent propositions),
+        # as well as separators (strings) between them.
+        # The propositions of each node are passed on to its children, so that they need not be derived again.
+        stack: List[Union[str, Tuple['Node', str, List[str], List[Proposition]]]] = \
+            [(self, indent, parentPropositions, self.propositions)]
+        while len(stack) > 0:
+            item = stack.pop()
+            if isinstance(item, str):
+                output.append(item)
+                continue
+            node, indent, parentPropositions, node_propositions = item
+            propositions = [str(p) for p in node_propositions]
+            parent = set(parentPropositions)
+            output.append(indent
+                          + ('\n' + indent).join([p for p in propositions
+                                                  if p not in parent])
+                          + '\n'
+                          + (indent + '❌\n' if node.closed else ""))
+            for i, child in reversed(list(enumerate(node.children))):
+                stack.append((child, indent + '    ', propositions,
+                              child.apply(node_propositions)))
+                if i > 0:
+                    stack.append('\n')
+        return ''.join(output)
 
-    def expand(self):
+    def expand(self, propositions: List[Proposition] = None):
         """
         Expands the next unexpanded argument.
         This means roughly that child nodes are added, where the unexpanded propositions will be replaced using the rewriting rules of propositonal tableau.
         One proposition is expanded at a time. If there are propositions whose expansion is non-branching, they will be considered first, to reduce redundancy in the new branches.
+        The propositions of the node can be passed if they are known already.
         """
-        simple: List[Proposition] = \
-            [p for p in self.propositions if not p.is_decomposable()]
-        # check for incosistencies in the simple propositions:
-        for a, b in itertools.product(simple, simple):
-            if isinstance(a, Not) and str(a.children[0]) == str(b):
-                self.closed = True
-                return
+        if self.expanded or self.closed:
+            return
+        self.expanded = True
+        if propositions is None:
+            propositions = self.propositions
         complex: List[Proposition] = \
-            [p for p in self.propositions if p.is_decomposable()]
+            [p for p in propositions if p.is_decomposable()]
         if len(complex) > 0:
             # sort the unexpanded propositions,
             # so that those propositions that fork a branch are treated last:
@@ -98,19 +248,43 @@ class Node:
             sorted_complex = complex_and_not_forking + complex_and_forking
             to_be_decomposed = sorted_complex[0]
             for branch_propositions in to_be_decomposed.decompose():
-                self.children.append(Node(
-                    [p for p in self.propositions if str(
-                        p) != str(to_be_decomposed)]
-                    + branch_propositions))
+                self.children.append(Node(branch_propositions, self,
+                                          to_be_decomposed, propositions))
 
-    def expandRecursively(self):
-        self.expand()
-        for child in self.children:
-            child.expandRecursively()
-
-    def is_invalid(self):
-        self.expandRecursively()
-        if len(self.children) > 0:
-            return all([child.is_invalid() for child in children])
-        else:
-            return self.closed
+    def expandRecursively(self, breadth_first: bool = False):
+        """
+        Expands the node and all its descendants, until every branch is closed or fully expanded.
+        The nodes still to be expanded are kept in an explicit work list (instead of recursing),
+        which is used as a stack (depth-first) or as a queue (breadth-first),
+        together with the propositions of each node.
+        """
+        work = deque([(self, self.propositions)])
+        while len(work) > 0:
+            node, propositions = work.popleft() if breadth_first else work.pop()
+            node.expand(propositions)
+            work.extend((child, child.apply(propositions))
+                        for child in node.children)
+
+    def find_open_branch(self) -> Optional['Node']:
+        """
+        Expands the nodes below this node depth-first, until it finds a fully expanded branch that is not closed,
+        and returns its leaf; or `None` if all branches are closed.
+        The rest of the tableau is left unexpanded.
+        """
+        stack = [(self, self.propositions)]
+        while len(stack) > 0:
+            node, propositions = stack.pop()
+            node.expand(propositions)
+            if node.closed:
+                continue
+            if len(node.children) == 0:
+                return node
+            stack.extend((child, child.apply(propositions))
+                         for child in reversed(node.children))
+        return None
+
+    def is_invalid(self) -> bool:
+        """
+        Whether all branches below the node are closed.
+        """
+        return self.find_open_branch() is None
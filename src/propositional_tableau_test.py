@@ -2,6 +2,8 @@ from reasoning_elements.proposition import *
 from propositional_tableau import *
 from propositional_parser import parse
 from textwrap import dedent
+import functools
+import pytest
 
 
 def test_or():
@@ -121,3 +123,138 @@ def test_expand_nonbranching_first():
 
                                 B
                         """)
+
+
+def test_structure_sharing():
+    node = Node([parse('(A ∨ B) ∧ C')])
+    node.expandRecursively()
+    child = node.children[0]
+    # The child only stores what it changes
+    assert child.removed == parse('(A ∨ B) ∧ C')
+    assert child.added == [parse('A ∨ B'), parse('C')]
+    assert child.propositions == [parse('A ∨ B'), parse('C')]
+    leaf = child.children[1]
+    assert leaf.added == [parse('B')]
+    assert leaf.propositions == [parse('C'), parse('B')]
+
+
+def test_breadth_first():
+    proposition = parse('¬((p ∨ (q ∧ r)) → ((p ∨ q) ∧ (p ∨ r)))')
+    assert str(Tableau(proposition, breadth_first=True)) \
+        == str(Tableau(proposition))
+
+
+engines = pytest.mark.parametrize('engine', ['tableau', 'cdcl', 'auto'])
+
+
+@engines
+def test_is_valid(engine):
+    assert is_valid('(p ∨ (q ∧ r)) → ((p ∨ q) ∧ (p ∨ r))', engine)
+    assert is_valid('A ∨ (¬A)', engine)
+    assert not is_valid('A ∨ B', engine)
+    assert is_satisfiable('A ∨ B', engine)
+    assert not is_satisfiable('(A ∨ B) ∧ (¬A) ∧ (¬B)', engine)
+
+
+@engines
+def test_find_model(engine):
+    model = find_model('(A ∨ B) ∧ (¬A)', engine)
+    assert model == {'A': False, 'B': True}
+    assert find_model('(A ∧ B) ∧ (¬A)', engine) is None
+    assert find_model('A ∧ false', engine) is None
+    counterexample = find_counterexample('(A → B) → B', engine)
+    assert counterexample == {'A': False, 'B': False}
+    assert not parse('(A → B) → B').eval(counterexample)
+    assert find_counterexample('A ∨ (¬A)', engine) is None
+
+
+def count_nodes(tableau):
+    tableau.expand()
+    count = 0
+    stack = [tableau.root]
+    while len(stack) > 0:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    return count
+
+
+def test_preprocess():
+    # A chain of equivalences, whose decomposition repeats the subpropositions
+    chain = functools.reduce(Equiv, [Variable(name) for name in 'abcdef'])
+    assert count_nodes(Tableau(chain, preprocess='nnf')) * 10 \
+        < count_nodes(Tableau(chain))
+    chain = functools.reduce(Equiv, [Variable(name) for name in 'abcd'])
+    for preprocess in [None, 'nnf', 'cnf', 'tseitin']:
+        assert is_satisfiable(chain, 'tableau', preprocess)
+        assert not is_valid(chain, 'tableau', preprocess)
+        model = find_model(chain, 'tableau', preprocess)
+        assert sorted(model) == list('abcd') and chain.eval(model)
+        assert is_valid('(A ↔ B) → ((¬A) ∨ B)', 'tableau', preprocess)
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        is_valid('A', 'magic')
+
+
+def test_early_termination():
+    tableau = Tableau(parse('A ∨ ((B ∨ C) ∧ (D ∨ E))'))
+    assert tableau.find_model() == {'A': True, 'B': False, 'C': False, 'D': False, 'E': False}
+    # Only the first branch was expanded
+    assert len(tableau.root.children) == 2
+    assert not tableau.root.children[1].expanded
+    # Printing expands the whole tableau
+    str(tableau)
+    assert tableau.root.children[1].expanded
+    assert len(tableau.root.children[1].children) == 1
+
+
+def test_deep_proposition():
+    # A disjunction of 3000 variables, written as implications (¬X0 → (¬X1 → ...)) so that it is nested 3000 levels deep
+    variables = [Variable('X' + str(i)) for i in range(3000)]
+    disjunction = functools.reduce(lambda a, b: Implies(Not(b), a), reversed(variables))
+    assert str(disjunction).startswith('¬X0 → (¬X1 → (¬X2 → ')
+    assert disjunction.depth() > 3000
+    assert disjunction.variables() == sorted(v.name for v in variables)
+    assert disjunction.eval({v.name: v.name == 'X2999' for v in variables})
+    assert is_satisfiable(disjunction, 'tableau')
+    assert is_satisfiable(disjunction, 'cdcl')
+    tableau = Tableau(disjunction)
+    tableau.expand()
+    # One branch for each variable, none of them closed
+    leaves = []
+    stack = [tableau.root]
+    while len(stack) > 0:
+        node = stack.pop()
+        if len(node.children) == 0:
+            leaves.append(node)
+        stack.extend(node.children)
+    assert len(leaves) == 3000
+    assert not any(leaf.closed for leaf in leaves)
+    # The tableau of the negation is a single branch that collects every negated variable,
+    # so validity is checked on a shorter disjunction.
+    shorter = functools.reduce(lambda a, b: Implies(Not(b), a), reversed(variables[:300]))
+    assert not is_valid(shorter, 'tableau')
+    assert is_valid(Or(Not(variables[0]), shorter), 'tableau')
+    # The SAT solver handles the whole disjunction
+    assert not is_valid(disjunction)
+    assert is_valid(Or(Not(variables[0]), disjunction))
+
+
+def test_nary_proposition():
+    # The same disjunction as a single n-ary `Or`: the tableau branches for all variables in one step.
+    variables = [Variable('X' + str(i)) for i in range(3000)]
+    disjunction = Or(*variables)
+    assert len(disjunction.children) == 3000
+    assert str(disjunction).startswith('X0 ∨ X1 ∨ X2 ∨ ')
+    tableau = Tableau(disjunction)
+    tableau.expand()
+    assert len(tableau.root.children) == 3000
+    assert not any(leaf.closed or len(leaf.children) > 0
+                   for leaf in tableau.root.children)
+    assert not is_valid(disjunction, 'tableau')
+    assert is_valid(Implies(variables[0], disjunction), 'tableau')
+    # A child next to its negation makes the disjunction true right away.
+    assert Or(Not(variables[0]), disjunction) == T()
+    assert not is_valid(disjunction, 'cdcl')
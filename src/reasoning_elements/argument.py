@@ -6,19 +6,20 @@ import functools
 
 
 @functools.total_ordering
-class Argument:
-    def __init__(self, support: Set[Union['Argument', Proposition, Test]], conclusion: Union[Proposition, Rule]):
+class Argument(Immutable):
+    __slots__ = ('support', 'conclusion')
+    support: FrozenSet[Union['Argument', Proposition, Test]]
+
+    @classmethod
+    def _normalize(cls, support: Iterable[Union['Argument', Proposition, Test]], conclusion: Union[Proposition, Rule]) -> tuple:
+        return (frozenset(support), conclusion)
+
+    def __init__(self, support: FrozenSet[Union['Argument', Proposition, Test]], conclusion: Union[Proposition, Rule]):
         self.support = support
         self.conclusion = conclusion
 
+    def __reduce__(self):
+        return (Argument, (self.support, self.conclusion))
+
     def __str__(self):
         return '({' + ', '.join(sorted(list({str(p) for p in self.support}))) + '}, ' + str(self.conclusion) + ')'
-
-    def __eq__(self, other):
-        return str(self) == str(other)
-
-    def __lt__(self, other):
-        return str(self) < str(other)
-
-    def __hash__(self):
-        return hash(str(self))
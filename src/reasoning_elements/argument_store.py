@@ -0,0 +1,107 @@
+from typing import *
+from reasoning_elements.proposition import *
+from reasoning_elements.rule import *
+from reasoning_elements.argument import *
+
+
+class ArgumentStore:
+    """
+    A set of arguments, indexed by their conclusion and by the elements of their support,
+    so that for a new argument, the arguments with the same conclusion and a smaller or bigger support
+    can be found without looking at all arguments (see `subsumes` and `superseded_by`).
+    The arguments that all nodes of a defeasible tableau share are kept in a store (see `Node.store`).
+    The store remembers when each argument was added (see `added_since`), and counts the changes
+    of its arguments for an inconsistency (`version`), so that the nodes can tell whether their results are up to date.
+    """
+
+    def __init__(self, arguments: Iterable[Argument] = ()):
+        self.by_conclusion: Dict[Union[Proposition, Rule], Set[Argument]] = {}
+        # For each conclusion and support element: the arguments with that conclusion and the element in their support
+        self.containing: Dict[Tuple[Union[Proposition, Rule], Any], Set[Argument]] = {}
+        # The number of additions so far, and for each argument, how many there were before it was last added
+        self.additions = 0
+        self.positions: Dict[Argument, int] = {}
+        self.version = 0
+        for a in arguments:
+            self.add(a)
+
+    def __contains__(self, a: Argument) -> bool:
+        return a in self.by_conclusion.get(a.conclusion, ())
+
+    def __iter__(self) -> Iterator[Argument]:
+        for arguments in self.by_conclusion.values():
+            yield from arguments
+
+    def __len__(self) -> int:
+        return sum(len(arguments) for arguments in self.by_conclusion.values())
+
+    def add(self, a: Argument):
+        """
+        Adds the argument, or marks it as added again if it is in the store already.
+        """
+        self.positions[a] = self.additions
+        self.additions += 1
+        if a.conclusion == _false:
+            self.version += 1
+        self.by_conclusion.setdefault(a.conclusion, set()).add(a)
+        for element in a.support:
+            self.containing.setdefault((a.conclusion, element), set()).add(a)
+
+    def remove(self, a: Argument):
+        arguments = self.by_conclusion[a.conclusion]
+        arguments.remove(a)
+        if len(arguments) == 0:
+            del self.by_conclusion[a.conclusion]
+        del self.positions[a]
+        if a.conclusion == _false:
+            self.version += 1
+        for element in a.support:
+            key = (a.conclusion, element)
+            self.containing[key].discard(a)
+            if len(self.containing[key]) == 0:
+                del self.containing[key]
+
+    def added_since(self, a: Argument, additions: int) -> bool:
+        """
+        Whether the argument has been added after the given number of additions.
+        """
+        return self.positions.get(a, -1) >= additions
+
+    def inconsistencies(self) -> Set[Argument]:
+        return self.by_conclusion.get(_false, set())
+
+    def subsumes(self, a: Argument) -> bool:
+        """
+        Whether there is an argument with the same conclusion whose support is a subset of the support of `a`
+        (`a` itself counts, too).
+        Only the arguments that share an element of the support with `a` are looked at:
+        One of them has a subset of the support if all of its elements are counted while going through those of `a`.
+        """
+        arguments = self.by_conclusion.get(a.conclusion)
+        if arguments is None:
+            return False
+        if Argument((), a.conclusion) in arguments:
+            return True
+        counts: Dict[Argument, int] = {}
+        for element in a.support:
+            for old in self.containing.get((a.conclusion, element), ()):
+                counts[old] = counts.get(old, 0) + 1
+                if counts[old] == len(old.support):
+                    return True
+        return False
+
+    def superseded_by(self, a: Argument) -> Set[Argument]:
+        """
+        The arguments with the same conclusion whose support is a proper superset of the support of `a`.
+        These are the arguments that contain all elements of the support of `a`,
+        starting from those with its rarest element.
+        """
+        if len(a.support) == 0:
+            candidates = self.by_conclusion.get(a.conclusion, set())
+        else:
+            indexed = sorted((self.containing.get((a.conclusion, element), set()) for element in a.support), key=len)
+            candidates = indexed[0].intersection(*indexed[1:])
+        return {old for old in candidates if len(old.support) > len(a.support)}
+
+
+_false = F()
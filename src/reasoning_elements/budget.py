@@ -0,0 +1,72 @@
+from typing import *
+import time
+import tracemalloc
+
+
+class BudgetExceeded(Exception):
+    """
+    Raised when a limit of a `Budget` is reached.
+    """
+
+
+class Budget:
+    """
+    Limits for evaluating a defeasible tableau (see `Tableau.evaluate`):
+        - `seconds`: the wall-clock time,
+        - `nodes`: the number of nodes that are created while expanding the tableau,
+        - `rounds`: the number of rounds of the main loop,
+        - `memory`: the number of bytes that the evaluation allocates (and still holds).
+    A limit of `None` means no limit.
+    The memory is traced with `tracemalloc`, which makes Python noticeably slower, so only if there is a memory limit.
+    While the tableau is evaluated, the budget counts what has been used so far (see `statistics`),
+    and which limit has been reached (`exceeded`), if any.
+    """
+
+    def __init__(self, seconds: float = None, nodes: int = None, rounds: int = None, memory: int = None):
+        self.limits: Dict[str, Optional[float]] = {
+            'seconds': seconds, 'nodes': nodes, 'rounds': rounds, 'memory': memory}
+        self.used: Dict[str, float] = {name: 0 for name in self.limits}
+        self.exceeded: Optional[str] = None
+        self.started = 0.0
+        # Whether the budget started tracing the memory (and thus stops it again), and the memory traced before
+        self.tracing = False
+        self.baseline = 0
+
+    def start(self):
+        self.used = {name: 0 for name in self.limits}
+        self.exceeded = None
+        self.started = time.perf_counter()
+        if self.limits['memory'] is not None:
+            self.tracing = not tracemalloc.is_tracing()
+            if self.tracing:
+                tracemalloc.start()
+            self.baseline = tracemalloc.get_traced_memory()[0]
+
+    def stop(self):
+        self.measure()
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
+
+    def spend(self, nodes: int = 0, rounds: int = 0):
+        """
+        Counts new nodes or rounds, and raises `BudgetExceeded` if a limit has been reached.
+        """
+        self.used['nodes'] += nodes
+        self.used['rounds'] += rounds
+        self.measure()
+        for name, limit in self.limits.items():
+            if limit is not None and self.used[name] > limit:
+                self.exceeded = name
+                raise BudgetExceeded(name)
+
+    def measure(self):
+        self.used['seconds'] = time.perf_counter() - self.started
+        if self.limits['memory'] is not None and tracemalloc.is_tracing():
+            self.used['memory'] = tracemalloc.get_traced_memory()[0] - self.baseline
+
+    def statistics(self) -> Dict[str, Any]:
+        """
+        What has been used of each limit, and which limit has been reached (or `None`).
+        """
+        return {**self.used, 'exceeded': self.exceeded}
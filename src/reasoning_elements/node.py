@@ -2,7 +2,10 @@ from typing import *
 from reasoning_elements.proposition import *
 from reasoning_elements.rule import *
 from reasoning_elements.argument import *
+from reasoning_elements.argument_store import *
+from reasoning_elements.budget import *
 from reasoning_elements.test import *
+import concurrent.futures
 import itertools
 
 """
@@ -14,130 +17,372 @@ Note that the propositional tableau currently uses its own Node structure (found
 class Node:
     """
     A node is a set of arguments, and a list of child nodes.
+    Like the nodes of the propositional tableau, a node only stores how its arguments differ from those of its parent:
+    the arguments it adds, and the decomposed argument it removes.
+    The arguments of the root, and those that are added to the whole tree later (see `add`),
+    are kept once for all nodes, in their shared `store`.
+    The `arguments` of a node are derived from these, and from the changes along its branch.
     """
+    __slots__ = ('parent', 'added', 'removed', 'children', 'store', 'additions', 'premises',
+                 'inconsistencies_below', 'inconsistencies_version')
 
-    def __init__(self, arguments: Set[Argument]):
-        self.arguments = arguments
+    parent: Optional['Node']
+
+    added: Tuple[Argument, ...]
+
+    removed: Optional[Argument]
+
+    # The arguments of the whole tree, and the number of additions to it when the node was created
+    store: ArgumentStore
+    additions: int
+
+    # The numbering of the support elements, shared by all nodes of the tree
+    premises: 'Premises'
+
+    # The result of `inconsistency_masks`, until the subtree of the node or the arguments for an inconsistency
+    # in the store change (the `version` of the store when it was computed)
+    inconsistencies_below: Optional[List[int]]
+    inconsistencies_version: int
+
+    def __init__(self, arguments: Iterable[Argument], parent: 'Node' = None, removed: Argument = None):
+        """
+        The arguments of the root go into the store.
+        """
+        self.parent = parent
+        if parent is None:
+            self.store = ArgumentStore(arguments)
+            self.premises = Premises()
+            self.added = ()
+        else:
+            self.store = parent.store
+            self.premises = parent.premises
+            self.added = tuple(arguments)
+        self.additions = self.store.additions
+        self.removed = removed
         self.children: List['Node'] = []
+        self.inconsistencies_below = None
+        self.inconsistencies_version = 0
+
+    @property
+    def arguments(self) -> Set[Argument]:
+        branch: List[Node] = []
+        node: Optional[Node] = self
+        while node is not None:
+            branch.append(node)
+            node = node.parent
+        arguments: Set[Argument] = set(self.store)
+        for node in reversed(branch):
+            arguments = node.apply(arguments)
+        return arguments
 
-    def __str__(self, indent: str = '', parentArguments: Set[Argument] = set()):
+    def apply(self, parent_arguments: Set[Argument]) -> Set[Argument]:
+        """
+        Returns the arguments of the node, given the arguments of its parent.
+        The removed argument is still there if it has been added to the tree again after the node was created.
+        """
+        if self.removed in parent_arguments and not self.store.added_since(self.removed, self.additions):
+            parent_arguments = parent_arguments - {self.removed}
+        return parent_arguments.union(self.added)
+
+    def __str__(self, indent: str = '', parentArguments: Set[Argument] = set(), arguments: Set[Argument] = None):
         """
         Does some fancy recursive indented printing.
         See `__str__` in `propositional_tableau.py` for an explanation how it works.
         """
+        if arguments is None:
+            arguments = self.arguments
         return (indent
-                + ('\n' + indent).join({str(a) for a in self.arguments
+                + ('\n' + indent).join({str(a) for a in arguments
                                         if a not in parentArguments})
                 + '\n'
-                + '\n'.join([child.__str__(indent + '    ', self.arguments) for child in self.children]))
+                + '\n'.join([child.__str__(indent + '    ', arguments, child.apply(arguments))
+                             for child in self.children]))
+
+    def __reduce__(self):
+        """
+        A node is pickled as a detached copy (see `detached`): a root with the arguments of the node,
+        and the changes that its descendants make, as a flat list with the position of the parent of each one,
+        so that deep trees do not run into the recursion limit of `pickle`.
+        Arguments that occur in several nodes are pickled only once.
+        """
+        changes: List[Tuple[int, Tuple[Argument, ...], Optional[Argument]]] = []
+        stack: List[Tuple[int, Node]] = [(0, child) for child in reversed(self.children)]
+        while len(stack) > 0:
+            parent, node = stack.pop()
+            changes.append((parent, node.added, node.removed))
+            stack.extend((len(changes), child) for child in reversed(node.children))
+        return (detached, (tuple(self.arguments), changes))
 
-    def expand(self):
+    def expand(self, arguments: Set[Argument] = None, new: Set[Argument] = None, budget: Budget = None):
         """
-        If there are no child nodes, tries to create child nodes.
-        Two things will be tried:
+        Expands the node and all its descendants, until no leaf can be expanded any further.
+        A leaf is expanded by trying two things:
             1. It tries to find an inconsistency between any two arguments in the node.
                (This is the last semantic tableau rule, and the only one involving multiple arguments.)
             2. If there are no inconsistencies, just apply the normal semantic tableau rule
                to the first decomposable argument in the node.
         Either of these two operations will create a child node.
             3. These child nodes (or the already existing child nodes) will also be expanded subsequently.
+        The arguments of the node can be passed if they are known already.
+        If the node has been expanded before, and `new` arguments have been added to it since (see `add`),
+        only what these arguments can change is looked at: inconsistencies that involve one of them,
+        and their decomposition. The nodes still to be expanded are kept in an explicit work list.
+        The new nodes are counted in the `budget`, which raises `BudgetExceeded` when a limit is reached
+        (see `Tableau.evaluate`).
         """
-        if len(self.children) == 0:
-            # `Simple` refers to arguments with atomic propositions, or with negated atomic propositions.
-            # We might find inconsistencies between these types of arguments.
-            simple: Set[Argument] = \
-                {a for a in self.arguments if not a.conclusion.is_decomposable()}
-            # 1.:
-            found_new_inconsistency = False
-            # Check out all pairs:
-            for a in simple:
-                for b in simple:
-                    # Check whether they are inconsistent:
-                    if not consistent([a, b]):
-                        # Create an argument for the inconsistency
-                        # by merging the supports of the arguments leading to it:
-                        support = a.support.union(b.support)
-                        new_inconsistency = Argument(support, F())
-                        if not new_inconsistency in self.arguments:
-                            self.children.append(
-                                Node(self.arguments | set([new_inconsistency]))
-                            )
-                            # We have already created a child, that's enough for now:
-                            found_new_inconsistency = True
-                            break
-            # 2.
-            if not found_new_inconsistency:
-                # `Complex` refers to arguments with a decomposable conclusion
-                # (that is, we can apply a tableau rule there).
-                complex: Set[Argument] = self.arguments - simple
-                if len(complex) > 0:
-                    # We sort the unexpanded propositions,
-                    # so that we preferably first decompose those arguments
-                    # where this does not lead to forking (=branching).
-                    complex_and_forking = \
-                        {p for p in complex if p.conclusion.is_forking()}
-                    complex_and_not_forking = \
-                        {p for p in complex if not p.conclusion.is_forking()}
-                    sorted_complex = list(
-                        complex_and_not_forking) + list(complex_and_forking)
-                    # We only decompose the first one of this list for now.
-                    to_be_decomposed = sorted_complex[0]
-                    # This creates a list of one or two lists (branches) of lists of arguments.
-                    for branch in to_be_decomposed.conclusion.decompose():
-                        self.children.append(
-                            Node(
-                                # We remove the decomposed argument in the child node,
-                                # because we don't want to consider it again:
-                                {a for a in self.arguments if a != to_be_decomposed}
-                                # And we add the new arguments for the respective branch:
-                                | {Argument(to_be_decomposed.support, argument)
-                                   for argument in branch}
-                            )
-                        )
-        # 3.
+        if new is not None and not any(a.conclusion.is_decomposable() for a in new):
+            work = self.touched_by(new)
+        else:
+            if arguments is None:
+                arguments = self.arguments
+            work = [(self, arguments, new)]
+        while len(work) > 0:
+            node, arguments, new = work.pop()
+            grown = len(node.children) == 0 and node.grow(arguments, new)
+            if grown and budget is not None:
+                budget.spend(nodes=len(node.children))
+            for child in node.children:
+                if new is None:
+                    child_new = None
+                elif grown:
+                    # The child still needs to look at the new arguments that the node did not get to,
+                    # and it has its own new ones.
+                    child_new = {a for a in new if a != child.removed}.union(child.added)
+                else:
+                    # The new arguments have been added to the child as well (see `add`).
+                    child_new = new
+                work.append((child, child.apply(arguments), child_new))
+
+    def expand_in_parallel(self, executor: concurrent.futures.Executor, workers: int, threshold: int,
+                           budget: Budget = None):
+        """
+        Expands the node and all its descendants like `expand`, but partly in other processes:
+            1. The tree is grown breadth-first, until it has two leaves for each worker (or cannot be grown any further).
+            2. Leaves with at least `threshold` decomposable arguments are sent to the `executor`,
+               which expands them in another process (see `expand_detached`). The others are expanded here.
+            3. The expanded subtrees are grafted onto their leaves (see `graft`),
+               with the arguments for an inconsistency that the workers have found in them.
+        The branches are independent of each other, so the result is the same as that of `expand`.
+        If a limit of the `budget` is reached, the subtrees that have not been expanded yet are cancelled,
+        but subtrees that are being expanded are not interrupted.
+        """
+        frontier: List[Tuple[Node, Set[Argument]]] = [(self, self.arguments)]
+        while 0 < len(frontier) < 2 * workers:
+            node, arguments = frontier.pop(0)
+            if len(node.children) == 0 and not node.grow(arguments):
+                continue
+            if budget is not None:
+                budget.spend(nodes=len(node.children))
+            frontier.extend((child, child.apply(arguments)) for child in node.children)
+        futures: Dict[concurrent.futures.Future, Node] = {}
+        try:
+            local: List[Tuple[Node, Set[Argument]]] = []
+            for node, arguments in frontier:
+                if len([a for a in arguments if a.conclusion.is_decomposable()]) >= threshold:
+                    futures[executor.submit(expand_detached, node)] = node
+                else:
+                    local.append((node, arguments))
+            for node, arguments in local:
+                node.expand(arguments, budget=budget)
+            for future in concurrent.futures.as_completed(futures):
+                expanded, supports = future.result()
+                count = futures[future].graft(expanded, supports)
+                if budget is not None:
+                    budget.spend(nodes=count)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def graft(self, expanded: 'Node', supports: List[FrozenSet] = None) -> int:
+        """
+        Moves the descendants of a detached copy of this leaf, which has been expanded elsewhere, under the leaf.
+        The `supports` of the arguments for an inconsistency in the copy become the result of `inconsistency_masks`
+        for the leaf; those of the descendants are not known (and are computed when they are needed).
+        Returns the number of descendants.
+        """
+        self.children = expanded.children
         for child in self.children:
-            child.expand()
+            child.parent = self
+        count = 0
+        stack = list(self.children)
+        while len(stack) > 0:
+            node = stack.pop()
+            count += 1
+            node.store = self.store
+            node.premises = self.premises
+            node.additions = self.store.additions
+            node.inconsistencies_below = None
+            stack.extend(node.children)
+        self.changed()
+        if supports is not None:
+            self.inconsistencies_below = self.premises.minimal(self.premises.mask(s) for s in supports)
+            self.inconsistencies_version = self.store.version
+        return count
+
+    def touched_by(self, new: Set[Argument]) -> List[Tuple['Node', Set[Argument], Set[Argument]]]:
+        """
+        Finds the subtrees that new arguments for literals can change (see `expand`):
+        A new literal can only be inconsistent with its complement or with `¬⊤` (see `inconsistent_with`),
+        so only the subtrees below the nodes that add one of these have to be expanded again.
+        Returns the topmost such nodes, with their arguments and the new arguments.
+        """
+        complements = {to_proposition(a).negate() for a in new}
+        complements.add(_not_true)
+        if _not_true in {to_proposition(a) for a in new}:
+            return [(self, self.arguments, new)]
+        if any(to_proposition(a) in complements for a in self.store):
+            return [(self, self.arguments, new)]
+        touched: List[Tuple[Node, Set[Argument], Set[Argument]]] = []
+        stack: List[Node] = [self]
+        while len(stack) > 0:
+            node = stack.pop()
+            if any(to_proposition(a) in complements for a in node.added):
+                touched.append((node, node.arguments, new))
+            else:
+                stack.extend(node.children)
+        return touched
+
+    def grow(self, arguments: Set[Argument], new: Set[Argument] = None) -> bool:
+        """
+        Creates the child nodes of a leaf (steps 1. and 2. of `expand`), if it can be expanded.
+        Returns whether it could.
+        With `new`, the leaf has been expanded as far as possible before the `new` arguments were added,
+        so every inconsistency that is not there yet involves one of them,
+        and they are the only arguments that can still be decomposed.
+        """
+        # `Simple` refers to arguments with atomic propositions, or with negated atomic propositions.
+        # We might find inconsistencies between these types of arguments.
+        simple: Set[Argument] = \
+            {a for a in arguments if not a.conclusion.is_decomposable()}
+        # 1.:
+        index = literal_index(simple)
+        # Check out all pairs that are inconsistent, which we look up in the index:
+        for a in (simple if new is None else simple.intersection(new)):
+            for b in inconsistent_with(a, simple, index):
+                # Create an argument for the inconsistency
+                # by merging the supports of the arguments leading to it:
+                support = a.support.union(b.support)
+                new_inconsistency = Argument(support, F())
+                if not new_inconsistency in arguments:
+                    self.children.append(
+                        Node([new_inconsistency], self)
+                    )
+                    self.changed()
+                    # We have already created a child, that's enough for now:
+                    return True
+        # 2.
+        # `Complex` refers to arguments with a decomposable conclusion
+        # (that is, we can apply a tableau rule there).
+        complex: Set[Argument] = \
+            (arguments if new is None else arguments.intersection(new)) - simple
+        if len(complex) > 0:
+            # We sort the unexpanded propositions,
+            # so that we preferably first decompose those arguments
+            # where this does not lead to forking (=branching).
+            complex_and_forking = \
+                {p for p in complex if p.conclusion.is_forking()}
+            complex_and_not_forking = \
+                {p for p in complex if not p.conclusion.is_forking()}
+            sorted_complex = list(
+                complex_and_not_forking) + list(complex_and_forking)
+            # We only decompose the first one of this list for now.
+            to_be_decomposed = sorted_complex[0]
+            # This creates a list of lists (branches) of arguments.
+            for branch in to_be_decomposed.conclusion.decompose():
+                self.children.append(
+                    Node(
+                        # We add the new arguments for the respective branch:
+                        {Argument(to_be_decomposed.support, argument)
+                         for argument in branch},
+                        self,
+                        # And we remove the decomposed argument in the child node,
+                        # because we don't want to consider it again:
+                        to_be_decomposed
+                    )
+                )
+            self.changed()
+            return True
+        return False
+
+    def changed(self):
+        """
+        Forgets the results of `inconsistency_masks` for the node and its ancestors, after its subtree changed.
+        (A node may have no result while its ancestors have one: Those of grafted subtrees are not known, see `graft`.)
+        """
+        node: Optional[Node] = self
+        while node is not None:
+            node.inconsistencies_below = None
+            node = node.parent
 
     def arguments_for_inconsistency(self) -> Set[Argument]:
         """
-        Return all arguments for an inconsistency in the node or in any child node.
+        Return all arguments for an inconsistency in the node or in any child node (see `inconsistency_masks`).
+        """
+        return {Argument(self.premises.support(mask), _false) for mask in self.inconsistency_masks()}
+
+    def inconsistency_masks(self, above: Tuple[int, ...] = None) -> List[int]:
+        """
+        Return the supports of all arguments for an inconsistency in the node or in any child node,
+        as bit masks (see `Premises`).
         We do this by considering the inconsistencies in the leaf nodes and then merging them together
         in an intricate way on our way back up to the node.
         At each step, we eliminate incosistencies where there are multiple tests in the support,
         because we won't be able to convert hese inconsistencies into useful constructive arguments later.
+        We also eliminate those whose support contains the support of another one with the same tests (see `Premises.minimal`),
+        since they can only lead to arguments with bigger supports.
         Inconsistencies are arguments with `F()` ("false", or ⟘) in their support.
+        They are never decomposed, so the inconsistencies of a leaf are those that its branch adds;
+        `above` are the supports of those of the ancestors of the node (and of the store), if they are known already.
+        The result is remembered until the subtree of the node changes (see `changed`),
+        or the arguments for an inconsistency in the store do.
         """
-        arguments: Set[Argument] = set()
+        if (self.inconsistencies_below is not None
+                and self.inconsistencies_version == self.store.version):
+            return self.inconsistencies_below
+        premises = self.premises
+        if above is None:
+            above = tuple(premises.mask(a.support) for a in self.store.inconsistencies())
+            ancestor = self.parent
+            while ancestor is not None:
+                above += tuple(premises.mask(a.support) for a in ancestor.inconsistencies())
+                ancestor = ancestor.parent
+        above += tuple(premises.mask(a.support) for a in self.inconsistencies())
         if len(self.children) == 0:
             # Here we are at a leaf node.
-            # We find and return arguments where the conclusion is an inconsistency
+            # We find and return the supports of arguments where the conclusion is an inconsistency
             # and where the support includes at most one test.
-
-            for a in self.arguments:
-                if a.conclusion == F():
-                    tests = {s for s in a.support if isinstance(s, Test)}
-                    if len(tests) <= 1:
-                        arguments.add(a)
+            supports = premises.minimal(m for m in above if premises.at_most_one_test(m))
         elif len(self.children) == 1:
             # Here we are in a straight branch.
             # We just pass upwards all the inconsistencies from the only child.
-            arguments = self.children[0].arguments_for_inconsistency()
-        elif len(self.children) == 2:
-            # Here we are at a fork between two branches. This is the most complicated position.
+            supports = self.children[0].inconsistency_masks(above)
+        else:
+            # Here we are at a fork between two or more branches (more for disjunctions of more than two propositions).
+            # This is the most complicated position.
             # The support for the closure of the node is the union of the support for the closure of the children.
             # But: There may be multiple such supports per child!
-            # So, we check all combinations of supports from the left and supports from the right:
-            for left in self.children[0].arguments_for_inconsistency():
-                for right in self.children[1].arguments_for_inconsistency():
-                    # We merge the combination.
-                    merged = left.support.union(right.support)
-                    # We keep only arguments with at most one test in the support.
-                    tests = {s for s in merged if isinstance(s, Test)}
-                    if len(tests) <= 1:
-                        if consistent(merged - tests):
-                            arguments.add(Argument(merged, F()))
+            # So, we check all combinations of supports from the different children, adding one child at a time:
+            supports = self.children[0].inconsistency_masks(above)
+            for child in self.children[1:]:
+                rights = child.inconsistency_masks(above)
+                merged_supports: List[int] = []
+                for left in supports:
+                    for right in rights:
+                        # We merge the combination.
+                        merged = left | right
+                        # We keep only arguments with at most one test in the support.
+                        if premises.at_most_one_test(merged) and premises.consistent(merged):
+                            merged_supports.append(merged)
+                supports = premises.minimal(merged_supports)
+        self.inconsistencies_below = supports
+        self.inconsistencies_version = self.store.version
+        return supports
 
-        return arguments
+    def inconsistencies(self) -> Tuple[Argument, ...]:
+        """
+        The arguments for an inconsistency that the node adds.
+        """
+        return tuple(a for a in self.added if a.conclusion == _false)
 
     def arguments_for_and_against(self, p: Proposition) -> Tuple[Set[Argument], Set[Argument]]:
         """
@@ -158,16 +403,29 @@ class Node:
 
     def add(self, arguments: Set[Argument]):
         """
-        Adds a list of arguments to the node and all its child nodes.
+        Adds arguments to all nodes of the tree, through the store.
+        The nodes that have removed one of them before have it again (see `apply`).
         """
-        self.arguments.update(arguments)
-        for child in self.children:
-            child.add(arguments)
+        for a in arguments:
+            self.store.add(a)
 
-    def get_undecided_propositions(self) -> Set[FrozenSet[str]]:
+    def discard(self, arguments: Set[Argument]):
+        """
+        Removes arguments from the store, and thus from all nodes of the tree.
+        Nodes that have decomposed one of them keep the result.
+        """
+        for a in arguments:
+            self.store.remove(a)
+
+    def get_undecided_propositions(self, arguments: Set[Argument] = None) -> Set[FrozenSet[str]]:
+        """
+        The arguments of the node can be passed if they are known already.
+        """
+        if arguments is None:
+            arguments = self.arguments
         if len(self.children) == 0:
             conclusions: Set[Proposition] = {
-                to_proposition(a) for a in self.arguments}
+                to_proposition(a) for a in arguments}
             # So we are at a leaf node.
             if not F() in conclusions:
                 # So we are in an open branch, where there is no argument for an inconsistency (`F()`).
@@ -175,11 +433,33 @@ class Node:
             else:
                 return {frozenset()}
         else:
-            branches = [child.get_undecided_propositions()for child in self.children]
+            branches = [child.get_undecided_propositions(child.apply(arguments))
+                        for child in self.children]
             merged_branches = list(itertools.chain(*branches))
             return {b for b in merged_branches if len(b) > 0}
 
 
+def detached(arguments: Tuple[Argument, ...], changes: List[Tuple[int, Tuple[Argument, ...], Optional[Argument]]]) -> Node:
+    """
+    Rebuilds a pickled node (see `Node.__reduce__`) as the root of a new tree.
+    """
+    nodes = [Node(arguments)]
+    for parent, added, removed in changes:
+        node = Node(added, nodes[parent], removed)
+        nodes[parent].children.append(node)
+        nodes.append(node)
+    return nodes[0]
+
+
+def expand_detached(node: Node) -> Tuple[Node, List[FrozenSet]]:
+    """
+    Expands a detached node (in a worker process, see `Node.expand_in_parallel`).
+    Returns the node, and the supports of the arguments for an inconsistency in it.
+    """
+    node.expand()
+    return node, [a.support for a in node.arguments_for_inconsistency()]
+
+
 def to_proposition(a: Union[Argument, Test, Rule, Proposition]) -> Proposition:
     if isinstance(a, Test):
         return a.content
@@ -192,10 +472,144 @@ def to_proposition(a: Union[Argument, Test, Rule, Proposition]) -> Proposition:
 
 
 def consistent(l):
-    for a in l:
-        for b in l:
-            if (isinstance(to_proposition(a), Not)
-                    and (to_proposition(a).children[0] == to_proposition(b)
-                         or to_proposition(a).children[0] == T())):
-                return False
+    """
+    Whether there is no proposition `p` together with `¬p` in `l`, and no `¬⊤`.
+    """
+    propositions = {to_proposition(a) for a in l}
+    for p in propositions:
+        if (isinstance(p, Not)
+                and (p.children[0] in propositions or p.children[0] == T())):
+            return False
     return True
+
+
+class Premises:
+    """
+    Numbers the elements of supports (propositions, tests and arguments) in a tree of nodes,
+    so that a support can be represented as a bit mask, with the bits of the numbers of its elements.
+    The union of two supports is then the bitwise or of their masks, and a support is a subset of another
+    if its mask has no bits that the other one does not have.
+    """
+
+    def __init__(self):
+        self.elements: List[Any] = []
+        self.numbers: Dict[Any, int] = {}
+        # The masks of the tests, of the elements for negations, and of the elements for `¬⊤`
+        self.tests = 0
+        self.negations = 0
+        self.not_true = 0
+        # The mask of the elements for each proposition, and the masks of the supports seen so far
+        self.by_proposition: Dict[Proposition, int] = {}
+        self.masks: Dict[FrozenSet, int] = {}
+
+    def number(self, element) -> int:
+        number = self.numbers.get(element)
+        if number is None:
+            number = len(self.elements)
+            self.elements.append(element)
+            self.numbers[element] = number
+            bit = 1 << number
+            if isinstance(element, Test):
+                self.tests |= bit
+            else:
+                p = to_proposition(element)
+                self.by_proposition[p] = self.by_proposition.get(p, 0) | bit
+                if p == _not_true:
+                    self.not_true |= bit
+                elif isinstance(p, Not):
+                    self.negations |= bit
+        return number
+
+    def mask(self, support: FrozenSet) -> int:
+        mask = self.masks.get(support)
+        if mask is None:
+            mask = 0
+            for element in support:
+                mask |= 1 << self.number(element)
+            self.masks[support] = mask
+        return mask
+
+    def support(self, mask: int) -> FrozenSet:
+        elements = []
+        while mask:
+            bit = mask & -mask
+            elements.append(self.elements[bit.bit_length() - 1])
+            mask ^= bit
+        return frozenset(elements)
+
+    def at_most_one_test(self, mask: int) -> bool:
+        tests = mask & self.tests
+        return tests & (tests - 1) == 0
+
+    def has_test(self, mask: int) -> bool:
+        return mask & self.tests != 0
+
+    def consistent(self, mask: int) -> bool:
+        """
+        Whether the support (without its tests) has no proposition `p` together with `¬p`, and no `¬⊤`
+        (see `consistent`).
+        Only the negations in it need to be looked at.
+        """
+        mask &= ~self.tests
+        if mask & self.not_true:
+            return False
+        negations = mask & self.negations
+        while negations:
+            bit = negations & -negations
+            p = to_proposition(self.elements[bit.bit_length() - 1])
+            if mask & self.by_proposition.get(p.children[0], 0):
+                return False
+            negations ^= bit
+        return True
+
+    def minimal(self, supports: Iterable[int]) -> List[int]:
+        """
+        Returns the supports (of arguments for an inconsistency) that do not contain another one of the supports
+        with the same tests. (With at most one test per support, a support with a test does not count as containing
+        one without tests: Only the first leads to a constructive argument, see `Tableau.transform_arguments`.)
+        The supports are looked at from small to big, and each one is only compared with those that have been kept,
+        and that either both have a test, or both do not.
+        """
+        kept: List[int] = []
+        groups: Tuple[List[int], List[int]] = ([], [])
+        for support in sorted(set(supports), key=lambda mask: bin(mask).count('1')):
+            group = groups[self.has_test(support)]
+            if all(k & ~support for k in group):
+                group.append(support)
+                kept.append(support)
+        return kept
+
+
+def literal_index(arguments: Iterable[Argument]) -> Dict[Proposition, Tuple[List[Argument], List[Argument]]]:
+    """
+    Indexes arguments for literals (atomic propositions or their negations) by their atomic proposition:
+    For each atom, the arguments for the atom, and the arguments for its negation.
+    """
+    index: Dict[Proposition, Tuple[List[Argument], List[Argument]]] = {}
+    for a in arguments:
+        p = to_proposition(a)
+        positive, negative = index.setdefault(p.strip_negation(), ([], []))
+        (negative if isinstance(p, Not) else positive).append(a)
+    return index
+
+
+def inconsistent_with(a: Argument, arguments: Iterable[Argument],
+                      index: Dict[Proposition, Tuple[List[Argument], List[Argument]]]) -> Iterator[Argument]:
+    """
+    Yields the arguments from `arguments` (indexed by `literal_index`) that are inconsistent with the literal argument `a`
+    (see `consistent`): those for the complementary literal, and those for `¬⊤`.
+    If `a` is an argument for `¬⊤` itself, all arguments are inconsistent with it.
+    """
+    p = to_proposition(a)
+    if p == _not_true:
+        yield from arguments
+        return
+    positive, negative = index.get(p.strip_negation(), ((), ()))
+    yield from (positive if isinstance(p, Not) else negative)
+    yield from index.get(_true, ((), ()))[1]
+
+
+# Building a proposition looks it up among the interned ones, so the ones that are needed often are kept.
+_true = T()
+_false = F()
+_not_true = Not(_true)
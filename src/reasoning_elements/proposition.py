@@ -2,24 +2,190 @@ from typing import *
 from abc import abstractmethod
 import itertools
 import functools
+import threading
+import weakref
+from operator import itemgetter, and_, or_
 
 
-class Proposition:
+class Interned(type):
+    """
+    Metaclass for immutable, hash-consed data structures.
+    Calling the class (e.g. `And(a, b)`) first normalizes the arguments with the class's `_normalize` method.
+    `_normalize` may also simplify the call to an existing object (e.g. `And(a, T())` to `a`), which is then returned.
+    If an object with the same class and the same normalized arguments exists already, that object is returned;
+    otherwise a new object is built, frozen, and remembered.
+    Since every distinct object is built only once, equality is just identity, and the hash is computed once.
+    Looking up and remembering an object happens under a lock, so that threads never get two different equal objects.
+    """
+
+    def __call__(cls, *args, **kwargs):
+        args = cls._normalize(*args, **kwargs)
+        if not isinstance(args, tuple):
+            return args
+        key = (cls,) + cls._identity(args)
+        with _lock:
+            reference = _interned.get(key)
+            instance = None if reference is None else reference()
+            if instance is None:
+                instance = super().__call__(*args)
+                # Setting the hash also freezes the object (see `Immutable.__setattr__`).
+                object.__setattr__(instance, '_hash', hash(key))
+                # The entry removes itself as soon as nothing else refers to the object.
+                _interned[key] = weakref.ref(
+                    instance, functools.partial(_forget, key))
+        return instance
+
+
+# Weak references to all interned objects, indexed by their class and identifying arguments.
+_interned: Dict[tuple, 'weakref.ref[Any]'] = {}
+
+
+def _forget(key: tuple, reference: 'weakref.ref[Any]'):
+    # A newer object with the same key may have replaced the entry already.
+    if _interned.get(key) is reference:
+        del _interned[key]
+
+
+# Reentrant, since building an object may build (and intern) other objects.
+_lock = threading.RLock()
+
+
+class Immutable(metaclass=Interned):
+    """
+    Common methods for all interned data structures.
+    Subclasses override `_normalize` to define which arguments make two objects the same,
+    and `__reduce__` so that copying and unpickling yield the interned object again.
+    All subclasses declare `__slots__`, so that the objects don't carry a `__dict__`.
+    """
+    __slots__ = ('_hash', '__weakref__')
+    _hash: int
+
+    @classmethod
+    def _normalize(cls, *args) -> Union[tuple, 'Immutable']:
+        return args
+
+    @classmethod
+    def _identity(cls, args: tuple) -> tuple:
+        """
+        The part of the normalized arguments that identifies an object; by default all of them.
+        """
+        return args
+
+    def __setattr__(self, name, value):
+        if hasattr(self, '_hash'):
+            raise AttributeError(
+                type(self).__name__ + ' objects are immutable')
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError(type(self).__name__ + ' objects are immutable')
+
+    def __lt__(self, other):
+        return str(self) < str(other)
+
+    def __hash__(self):
+        return self._hash
+
+
+class Proposition(Immutable):
     """
     Each proposition is either a truth value, a variable, or a complex (=composite) proposition, made up of some other propositions and an operator connecting them. This abstract class defines some common methods for all of them.
+    Propositions are interned: building the same proposition twice yields the very same object.
     """
+    __slots__ = ('_compiled', '_forms')
+    _compiled: Tuple[List[str], Callable[[Sequence[bool]], bool]]
+    # Normal forms of the proposition that have been computed, by name (see `_form`)
+    _forms: Dict[str, Any]
 
-    @abstractmethod
-    def eval(self, model) -> bool:
+    def eval(self, model: Dict[str, bool]) -> bool:
         """
         Returns the truth value of the proposition given a model assigning a truth value to each variable.
         """
+        variables, function = self._compilation()
+        try:
+            values = [model[name] for name in variables]
+        except KeyError as e:
+            raise KeyError(
+                'The specified model does not include a value for variable '
+                + e.args[0] + ': ' + str(model)) from None
+        return function(values)
+
+    def compile(self) -> Callable[[Sequence[bool]], bool]:
+        """
+        Returns a function that evaluates the proposition.
+        The function takes a sequence with one truth value for each variable, in the order of `variables()`.
+        `∧`, `∨` and `→` are short-circuited.
+        The function is built only once per proposition, and then reused.
+        """
+        return self._compilation()[1]
+
+    def _compilation(self) -> Tuple[List[str], Callable[[Sequence[bool]], bool]]:
+        try:
+            return self._compiled
+        except AttributeError:
+            order = self.subpropositions()
+            variables = sorted({p.name for p in order if isinstance(p, Variable)})
+            index = {name: i for i, name in enumerate(variables)}
+            if self.depth(order) > MAX_COMPILED_DEPTH:
+                # Nested closures would exceed Python's recursion limit when called.
+                function = evaluator(order, index)
+            else:
+                # Children come before their parents in `order`,
+                # so the closures of the children are always there already.
+                memo: Dict[Proposition, Callable] = {}
+                for p in order:
+                    memo[p] = p._closure(index, memo)
+                function = memo[self]
+            compiled = (variables, function)
+            # This is only a cache, so it doesn't violate the immutability.
+            object.__setattr__(self, '_compiled', compiled)
+            return compiled
 
     @abstractmethod
+    def _closure(self, index: Dict[str, int], memo: Dict['Proposition', Callable]) -> Callable[[Sequence[bool]], bool]:
+        """
+        Builds the function for `compile`, given the position of each variable in the sequence of truth values,
+        and the functions of the child propositions in the `memo`.
+        """
+
+    def subpropositions(self) -> List['Proposition']:
+        """
+        Returns all distinct subpropositions (including the proposition itself), children before their parents.
+        Uses an explicit stack rather than recursion, so that deeply nested propositions can be handled.
+        """
+        order: List[Proposition] = []
+        done: Set[Proposition] = set()
+        stack: List[Proposition] = [self]
+        while len(stack) > 0:
+            p = stack[-1]
+            if p in done:
+                stack.pop()
+                continue
+            missing = [c for c in getattr(p, 'children', ()) if c not in done]
+            if len(missing) > 0:
+                stack.extend(missing)
+            else:
+                stack.pop()
+                done.add(p)
+                order.append(p)
+        return order
+
+    def depth(self, order: List['Proposition'] = None) -> int:
+        """
+        The nesting depth of the proposition; atomic propositions have depth 1.
+        """
+        depths: Dict[Proposition, int] = {}
+        for p in order or self.subpropositions():
+            depths[p] = 1 + max((depths[c] for c in getattr(p, 'children', ())),
+                                default=0)
+        return depths[self]
+
     def variables(self) -> List[str]:
         """
         Returns a unique list of all variable names occuring in the proposition.
         """
+        return sorted({p.name for p in self.subpropositions()
+                       if isinstance(p, Variable)})
 
     def truthtable(self) -> List[Tuple[Dict[str, bool], bool]]:
         """
@@ -27,11 +193,112 @@ class Proposition:
         """
         variables = self.variables()
         rows = itertools.product([True, False], repeat=len(variables))
-        table = []
-        for row in rows:
-            model = dict(zip(variables, row))
-            table.append((model, self.eval(model)))
-        return table
+        values = itertools.chain.from_iterable(
+            column_bits(column, rows_per_chunk)
+            for _, column, rows_per_chunk in self.truthtable_columns())
+        return [(dict(zip(variables, row)), value)
+                for row, value in zip(rows, values)]
+
+    def truthtable_columns(self, chunk_size: int = 20) -> Iterator[Tuple[Dict[str, bool], int, int]]:
+        """
+        Computes the truth table bit-parallel, in chunks of at most `2 ** chunk_size` rows,
+        without ever building the whole table.
+        Within a chunk, the last `chunk_size` variables take all possible values, while the other variables are fixed.
+        Yields for each chunk a triple of:
+            - the model for the fixed variables,
+            - an `int` whose `i`-th bit is the truth value of the proposition in the `i`-th row of the chunk,
+            - the number of rows in the chunk.
+        The rows and chunks are in the same order as in `truthtable()`.
+        """
+        variables = self.variables()
+        split = max(len(variables) - chunk_size, 0)
+        fixed, varying = variables[:split], variables[split:]
+        rows = 1 << len(varying)
+        ones = (1 << rows) - 1
+        varying_columns = {name: variable_column(i, len(varying))
+                           for i, name in enumerate(varying)}
+        for fixed_values in itertools.product([True, False], repeat=len(fixed)):
+            model = dict(zip(fixed, fixed_values))
+            columns = dict(varying_columns)
+            columns.update({name: ones if value else 0
+                            for name, value in model.items()})
+            yield model, self.eval_columns(columns, ones), rows
+
+    def count_models(self, chunk_size: int = 20) -> int:
+        """
+        Counts the rows of the truth table where the proposition is true, using `truthtable_columns`.
+        """
+        return sum(bin(column).count('1')
+                   for _, column, _ in self.truthtable_columns(chunk_size))
+
+    def is_satisfiable(self, chunk_size: int = 20) -> bool:
+        """
+        Whether the proposition is true in at least one row of the truth table.
+        Stops at the first chunk of `truthtable_columns` with such a row.
+        """
+        return any(column != 0
+                   for _, column, _ in self.truthtable_columns(chunk_size))
+
+    def is_valid(self, chunk_size: int = 20) -> bool:
+        """
+        Whether the proposition is true in all rows of the truth table.
+        Stops at the first chunk of `truthtable_columns` with a counterexample.
+        """
+        return all(column == (1 << rows) - 1
+                   for _, column, rows in self.truthtable_columns(chunk_size))
+
+    def eval_columns(self, columns: Mapping[str, Any], ones: Any) -> Any:
+        """
+        Evaluates the proposition for many models at once.
+        Each column holds the truth values of one variable in all of the models, as a bitset;
+        the result is the column of truth values of the whole proposition.
+        A column is either an `int` (whose `i`-th bit belongs to the `i`-th model)
+        or a NumPy array of booleans or unsigned integers.
+        `ones` is the column where all values are true, e.g. `(1 << number_of_models) - 1`.
+        """
+        return self._eval_columns(columns, ones, {})
+
+    def eval_batch(self, table, variables: Union[Sequence[str], Mapping[str, int], None] = None):
+        """
+        Evaluates the proposition for many models at once, with vectorised NumPy operations.
+        The `table` is either
+            - a mapping from each variable name to a one-dimensional array of truth values (one per model), or
+            - a two-dimensional array with one row per model and one column per variable;
+              then `variables` names the columns, either as a list of names or as a mapping from names to column indices.
+        Returns a boolean NumPy array with the truth value of the proposition in each model.
+        Like `eval`, raises a `KeyError` if there is no value for a variable of the proposition.
+        Requires NumPy, which is not installed by default.
+        """
+        import numpy
+        if variables is None:
+            table = {name: numpy.asarray(column, dtype=bool)
+                     for name, column in table.items()}
+            rows = len(next(iter(table.values()))) if len(table) > 0 else 0
+        else:
+            table = numpy.asarray(table, dtype=bool)
+            if not isinstance(variables, Mapping):
+                variables = {name: i for i, name in enumerate(variables)}
+            table, rows = ({name: table[:, i] for name, i in variables.items()},
+                           table.shape[0])
+        for name in self.variables():
+            if name not in table:
+                raise KeyError(
+                    'The specified model does not include a value for variable '
+                    + name + ': ' + str(sorted(table.keys())))
+        ones = numpy.ones(rows, dtype=bool)
+        return numpy.array(self.eval_columns(table, ones), dtype=bool)
+
+    def _eval_columns(self, columns: Mapping[str, Any], ones: Any, memo: Dict['Proposition', Any]) -> Any:
+        # Children come before their parents, and subpropositions that occur multiple times are evaluated only once.
+        for p in self.subpropositions():
+            memo[p] = p._column(columns, ones, memo)
+        return memo[self]
+
+    @abstractmethod
+    def _column(self, columns: Mapping[str, Any], ones: Any, memo: Dict['Proposition', Any]) -> Any:
+        """
+        Computes the column for `eval_columns`, given the columns of the child propositions in the `memo`.
+        """
 
     def print_truthtable(self):
         for row in self.truthtable():
@@ -51,14 +318,135 @@ class Proposition:
     def strip_negation(self) -> 'Proposition':
         return self.children[0] if isinstance(self, Not) else self
 
-    def __eq__(self, other):
-        return str(self) == str(other)
+    def to_nnf(self) -> 'Proposition':
+        """
+        Returns an equivalent proposition in negation normal form:
+        built from variables, truth values and their negations with `∧` and `∨` only.
+        `→` and `↔` are rewritten, and negations are pushed inwards.
+        """
+        return self._nnf()[0]
 
-    def __lt__(self, other):
-        return str(self) < str(other)
+    def _nnf(self) -> Tuple['Proposition', 'Proposition']:
+        """
+        The negation normal forms of the proposition and of its negation.
+        They are remembered for each subproposition, so shared subpropositions are converted only once.
+        """
+        for p in self.subpropositions():
+            if p._form('nnf') is None:
+                p._remember('nnf', p._nnf_from(
+                    *[c._form('nnf') for c in getattr(p, 'children', ())]))
+        return self._form('nnf')
 
-    def __hash__(self):
-        return hash(str(self))
+    @abstractmethod
+    def _nnf_from(self, *children: Tuple['Proposition', 'Proposition']) -> Tuple['Proposition', 'Proposition']:
+        """
+        Builds the negation normal forms of the proposition and of its negation,
+        given those of the child propositions.
+        """
+
+    def to_cnf(self, max_clauses: int = 10000) -> 'Proposition':
+        """
+        Returns an equivalent proposition in conjunctive normal form: a conjunction of disjunctions of literals.
+        It is built by distributing `∨` over `∧` in the negation normal form, which can make it exponentially big;
+        if it would have more than `max_clauses` clauses, a `ValueError` is raised (see `to_tseitin` for an alternative).
+        Tautological and repeated clauses are left out.
+        """
+        return And(*[Or(*clause) for clause in self.cnf_clauses(max_clauses)])
+
+    def cnf_clauses(self, max_clauses: int = 10000) -> List[Tuple['Proposition', ...]]:
+        """
+        The clauses of `to_cnf`, as tuples of literals.
+        """
+        nnf = self.to_nnf()
+        for p in nnf.subpropositions():
+            if p._form('cnf') is not None:
+                continue
+            if isinstance(p, And):
+                clauses = list(dict.fromkeys(
+                    flat(c._form('cnf') for c in p.children)))
+            elif isinstance(p, Or):
+                # The clauses of the children are distributed over each other, one child at a time.
+                clauses = [()]
+                for child in p.children:
+                    right = child._form('cnf')
+                    if len(clauses) * len(right) > max_clauses:
+                        raise ValueError('The conjunctive normal form of the proposition has more than '
+                                         + str(max_clauses) + ' clauses')
+                    clauses = list(dict.fromkeys(
+                        clause for clause in (tuple(dict.fromkeys(a + b)) for a in clauses for b in right)
+                        if not is_tautological(clause)))
+            elif p == T() or p == Not(F()):
+                clauses = []
+            elif p == F() or p == Not(T()):
+                clauses = [()]
+            else:
+                clauses = [(p,)]
+            if len(clauses) > max_clauses:
+                raise ValueError('The conjunctive normal form of the proposition has more than '
+                                 + str(max_clauses) + ' clauses')
+            p._remember('cnf', clauses)
+        return nnf._form('cnf')
+
+    def to_tseitin(self) -> 'Proposition':
+        """
+        Returns a proposition in conjunctive normal form that is satisfiable if and only if this one is,
+        and that has only linearly many clauses (the Tseitin transformation):
+        Every complex subproposition (except for negations) is named by a new variable,
+        whose clauses make it equivalent to the subproposition (see `ComplexProposition.clauses`).
+        The new variables are called `τ1`, `τ2`, ...; every subproposition keeps its variable,
+        so shared subpropositions are converted only once.
+        In every model of the result, the variables of this proposition form a model of it.
+        """
+        literals: Dict[Proposition, Proposition] = {}
+        clauses: List[Proposition] = []
+        for p in self.subpropositions():
+            if isinstance(p, Not):
+                literals[p] = literals[p.children[0]].negate()
+            elif not isinstance(p, ComplexProposition):
+                literals[p] = p
+            else:
+                variable = p._form('tseitin')
+                if variable is None:
+                    variable = Variable('τ' + str(next(_tseitin_variables)))
+                    p._remember('tseitin', variable)
+                literals[p] = variable
+                # The clauses are built for integer literals first, which are then replaced by the propositions.
+                children = [literals[c] for c in p.children]
+                numbered = {i + 2: c for i, c in enumerate(children)}
+                numbered[1] = variable
+                for clause in p.clauses(1, *range(2, len(children) + 2)):
+                    clauses.append(Or(*[
+                        numbered[l] if l > 0 else numbered[-l].negate() for l in clause]))
+        return And(literals[self], *clauses)
+
+    def to_normal_form(self, form: Optional[str]) -> 'Proposition':
+        """
+        Converts the proposition with `to_nnf`, `to_cnf` or `to_tseitin`, given `'nnf'`, `'cnf'` or `'tseitin'`.
+        With `None`, the proposition is returned as it is.
+        """
+        if form is None:
+            return self
+        elif form == 'nnf':
+            return self.to_nnf()
+        elif form == 'cnf':
+            return self.to_cnf()
+        elif form == 'tseitin':
+            return self.to_tseitin()
+        else:
+            raise ValueError('Unknown normal form: ' + str(form))
+
+    def _form(self, name: str) -> Any:
+        try:
+            return self._forms.get(name)
+        except AttributeError:
+            return None
+
+    def _remember(self, name: str, form: Any):
+        try:
+            self._forms[name] = form
+        except AttributeError:
+            # This is only a cache, so it doesn't violate the immutability.
+            object.__setattr__(self, '_forms', {name: form})
 
 
 @functools.total_ordering
@@ -66,29 +454,39 @@ class Variable(Proposition):
     """
     An atomic proposition consisting of just a propositional variable.
     """
+    __slots__ = ('name',)
+
+    name: str
+
+    @classmethod
+    def _normalize(cls, a: str) -> tuple:
+        if not isinstance(a, str):
+            raise Exception('Wrong type of variable name: ' + str(type(a)))
+        # `str(...)` turns subclasses of `str` (such as parser tokens) into plain strings.
+        return (str(a),)
 
     def __init__(self, a: str):
         self.name = a
 
+    def __reduce__(self):
+        return (Variable, (self.name,))
+
     def __str__(self):
         return self.name
 
-    def eval(self, model: Dict[str, bool]) -> bool:
-        if self.name in model:
-            return model[self.name]
-        else:
-            raise KeyError(
-                'The specified model does not include a value for variable '
-                + self.name + ': ' + str(model))
-
-    def variables(self) -> List[str]:
-        return [self.name]
+    def _closure(self, index, memo):
+        return itemgetter(index[self.name])
 
-    def __eq__(self, other):
-        return str(self) == str(other)
+    def _nnf_from(self):
+        return self, Not(self)
 
-    def __hash__(self):
-        return hash(str(self))
+    def _column(self, columns, ones, memo):
+        if self.name in columns:
+            return columns[self.name]
+        else:
+            raise KeyError(
+                'The specified columns do not include a value for variable '
+                + self.name)
 
 
 @functools.total_ordering
@@ -96,37 +494,55 @@ class TruthValue(Proposition):
     """
     An atomic proposition consisting of just a fixed truth value (true or false).
     """
+    __slots__ = ('value',)
     value: bool
 
     def __str__(self):
         return str(self.value)
 
-    def eval(self, _) -> bool:
-        return self.value
+    def _closure(self, index, memo):
+        value = self.value
+        return lambda values: value
 
-    def variables(self) -> List[str]:
-        return []
+    def _nnf_from(self):
+        return self, (F() if self.value else T())
+
+    def _column(self, columns, ones, memo):
+        return ones if self.value else ones ^ ones
+
+    def __reduce__(self):
+        return (type(self), ())
 
 
 class T(TruthValue):
+    __slots__ = ()
+
     def __init__(self):
         self.value = True
 
 
 class F(TruthValue):
+    __slots__ = ()
+
     def __init__(self):
         self.value = False
 
 
+# The truth values are constants, so they are kept alive instead of being re-interned on every `T()` or `F()`.
+_truth_values = (T(), F())
+
+
 class ComplexProposition(Proposition):
     """
     Proposition consisting of one or more other complex or atomic propositions, and an operator on them.
     """
+    __slots__ = ('children',)
 
-    children: List[Proposition]
+    children: Tuple[Proposition, ...]
 
-    def __init__(self, *args):
-        self.children = []
+    @classmethod
+    def _normalize(cls, *args) -> tuple:
+        children = []
         for arg in args:
             if type(arg) is str:
                 # Shortcut for creating an atomic proposition without needing to call `AtomicProposition()` explicitly.
@@ -136,29 +552,53 @@ class ComplexProposition(Proposition):
             else:
                 raise Exception(
                     'Wrong type of child expression: ' + str(type(arg)))
-            self.children.append(child)
+            children.append(child)
+        return tuple(children)
+
+    def __init__(self, *children: Proposition):
+        self.children = children
+
+    def __reduce__(self):
+        return (type(self), self.children)
 
     def __str__(self):
+        # The string is built bottom-up with an explicit stack rather than by recursion,
+        # so that deeply nested propositions can be printed.
+        # `strings` holds the strings of the complex subpropositions that are done already.
+        strings: Dict[Proposition, str] = {}
+        stack: List[ComplexProposition] = [self]
+        while len(stack) > 0:
+            p = stack[-1]
+            missing = [c for c in p.children
+                       if isinstance(c, ComplexProposition) and c not in strings]
+            if len(missing) > 0:
+                stack.extend(missing)
+            else:
+                stack.pop()
+                strings[p] = p._render(strings)
+        return strings[self]
+
+    def _render(self, strings: Dict[Proposition, str]) -> str:
         children = self.children
         op = self.operator_symbol
 
         def brackets(a):
             if isinstance(a, ComplexProposition) and not isinstance(a, Not):
-                return "(" + str(a) + ")"
+                return "(" + strings[a] + ")"
             else:
-                return str(a)
+                return strings[a] if a in strings else str(a)
         if len(children) == 1:
-            s = op + brackets(children[0])
-        elif len(children) == 2:
-            s = brackets(children[0]) + ' ' + op + ' ' + brackets(children[1])
-        return s
+            return op + brackets(children[0])
+        return (' ' + op + ' ').join(brackets(c) for c in children)
 
-    def eval(self, model: Dict[str, bool]) -> bool:
-        evaluatedChildren = [child.eval(model) for child in self.children]
-        return self.operator(*evaluatedChildren)
+    def _closure(self, index, memo):
+        # Generic version; the operators below have specialised ones.
+        operator = self.operator
+        children = [memo[child] for child in self.children]
+        return lambda values: operator(*[child(values) for child in children])
 
-    def variables(self) -> List[str]:
-        return sorted(list(set(flat([child.variables() for child in self.children]))))
+    def _column(self, columns, ones, memo):
+        return self.bitwise(ones, *[memo[child] for child in self.children])
 
     """Text symbol of the logical operator connecting the child propositions of the proposition."""
     operator_symbol: str
@@ -169,6 +609,19 @@ class ComplexProposition(Proposition):
         Implementation of the logical operator connecting the child propositions of the proposition.
         """
 
+    @abstractmethod
+    def bitwise(self, ones: Any, *columns: Any) -> Any:
+        """
+        Bit-parallel version of `operator`: Applies the operator to whole columns of truth values at once (see `eval_columns`).
+        """
+
+    @abstractmethod
+    def clauses(self, literal: int, *children: int) -> List[List[int]]:
+        """
+        The clauses (lists of literals, where `-v` is the negation of `v`) that make `literal` equivalent to the proposition,
+        given the literals of the child propositions (see `tseitin` in `sat_solver.py`).
+        """
+
     @abstractmethod
     def is_forking(self) -> bool:
         """
@@ -178,7 +631,7 @@ class ComplexProposition(Proposition):
     @abstractmethod
     def decompose(self) -> List[List[Proposition]]:
         """
-        Applies the tableau rule to the proposition and returns the result. The result takes the form of a list of one or two branches, each of which contains a list of one or two derived propositions.
+        Applies the tableau rule to the proposition and returns the result. The result takes the form of a list of branches (one, or one per child of a disjunction), each of which contains a list of derived propositions.
         """
 
     @abstractmethod
@@ -188,38 +641,113 @@ class ComplexProposition(Proposition):
         """
 
 
+class Junction(ComplexProposition):
+    """
+    Common base of `And` and `Or`, which take any number of children.
+    Building one simplifies it:
+        - children of the same kind are flattened into it (`(a ∧ b) ∧ c` is `a ∧ b ∧ c`),
+        - repeated children are left out,
+        - the neutral truth value is left out (`a ∧ ⊤` is `a`), and the dominant one decides (`a ∧ ⟘` is `⟘`),
+        - a child next to its negation decides as well (`a ∧ ¬a` is `⟘`),
+        - without children, the result is the neutral truth value, and with one child, it is that child.
+    """
+    __slots__ = ()
+    # The truth value that does not change the result, and the one that decides it
+    neutral: Type[TruthValue]
+    dominant: Type[TruthValue]
+
+    @classmethod
+    def _normalize(cls, *args) -> Union[tuple, Proposition]:
+        children: Dict[Proposition, None] = {}
+        # The children that are negated by another child
+        negated: Set[Proposition] = set()
+        stack = list(reversed(super()._normalize(*args)))
+        while len(stack) > 0:
+            child = stack.pop()
+            if type(child) is cls:
+                stack.extend(reversed(child.children))
+            elif isinstance(child, cls.neutral):
+                continue
+            elif isinstance(child, cls.dominant) or child in negated \
+                    or (isinstance(child, Not) and child.children[0] in children):
+                return cls.dominant()
+            else:
+                children[child] = None
+                if isinstance(child, Not):
+                    negated.add(child.children[0])
+        if len(children) == 0:
+            return cls.neutral()
+        if len(children) == 1:
+            return next(iter(children))
+        return tuple(children)
+
+
 @functools.total_ordering
-class And(ComplexProposition):
+class And(Junction):
+    __slots__ = ()
     operator_symbol = '∧'
-    def operator(self, a, b): return a and b
+    neutral = T
+    dominant = F
+    def operator(self, *args): return all(args)
+    def bitwise(self, ones, *columns): return functools.reduce(and_, columns)
+    def clauses(self, v, *children): return [[-v, c] for c in children] + [[v] + [-c for c in children]]
+    def _nnf_from(self, *children): return And(*[c[0] for c in children]), Or(*[c[1] for c in children])
     def is_forking(self): return False
 
+    def _closure(self, index, memo):
+        children = [memo[child] for child in self.children]
+        if len(children) == 2:
+            a, b = children
+            return lambda values: a(values) and b(values)
+        return lambda values: all(child(values) for child in children)
+
     def decompose(self):
-        return [[self.children[0], self.children[1]]]
+        return [list(self.children)]
 
     def decompose_negated(self):
-        return [[Not(self.children[0])], [Not(self.children[1])]]
+        return [[Not(child)] for child in self.children]
 
 
 @functools.total_ordering
-class Or(ComplexProposition):
+class Or(Junction):
+    __slots__ = ()
     operator_symbol = '∨'
-    def operator(self, a, b): return a or b
+    neutral = F
+    dominant = T
+    def operator(self, *args): return any(args)
+    def bitwise(self, ones, *columns): return functools.reduce(or_, columns)
+    def clauses(self, v, *children): return [[-v] + list(children)] + [[v, -c] for c in children]
+    def _nnf_from(self, *children): return Or(*[c[0] for c in children]), And(*[c[1] for c in children])
     def is_forking(self): return True
 
+    def _closure(self, index, memo):
+        children = [memo[child] for child in self.children]
+        if len(children) == 2:
+            a, b = children
+            return lambda values: a(values) or b(values)
+        return lambda values: any(child(values) for child in children)
+
     def decompose(self):
-        return [[self.children[0]], [self.children[1]]]
+        return [[child] for child in self.children]
 
     def decompose_negated(self):
-        return [[Not(self.children[0]), Not(self.children[1])]]
+        return [[Not(child) for child in self.children]]
 
 
 @functools.total_ordering
 class Implies(ComplexProposition):
+    __slots__ = ()
     operator_symbol = '→'
     def operator(self, a, b): return b or (not a)
+    def bitwise(self, ones, a, b): return (ones ^ a) | b
+    def clauses(self, v, a, b): return [[-v, -a, b], [v, a], [v, -b]]
+    def _nnf_from(self, a, b): return Or(a[1], b[0]), And(a[0], b[1])
     def is_forking(self): return True
 
+    def _closure(self, index, memo):
+        a, b = [memo[child] for child in self.children]
+        return lambda values: (not a(values)) or b(values)
+
     def decompose(self):
         return [[Not(self.children[0])], [self.children[1]]]
 
@@ -229,10 +757,21 @@ class Implies(ComplexProposition):
 
 @functools.total_ordering
 class Equiv(ComplexProposition):
+    __slots__ = ()
     operator_symbol = '↔'
     def operator(self, a, b): return a == b
+    def bitwise(self, ones, a, b): return ones ^ (a ^ b)
+    def clauses(self, v, a, b): return [[-v, -a, b], [-v, a, -b], [v, a, b], [v, -a, -b]]
     def is_forking(self): return False
 
+    def _closure(self, index, memo):
+        a, b = [memo[child] for child in self.children]
+        return lambda values: a(values) == b(values)
+
+    def _nnf_from(self, a, b):
+        return (Or(And(a[0], b[0]), And(a[1], b[1])),
+                Or(And(a[0], b[1]), And(a[1], b[0])))
+
     def decompose(self):
         return [[Implies(self.children[0], self.children[1]),
                  Implies(self.children[1], self.children[0])]]
@@ -244,8 +783,16 @@ class Equiv(ComplexProposition):
 
 @functools.total_ordering
 class Not(ComplexProposition):
+    __slots__ = ()
     operator_symbol = '¬'
     def operator(self, a): return not a
+    def bitwise(self, ones, a): return ones ^ a
+    def clauses(self, v, a): return [[-v, -a], [v, a]]
+    def _nnf_from(self, a): return a[1], a[0]
+
+    def _closure(self, index, memo):
+        a = memo[self.children[0]]
+        return lambda values: not a(values)
 
     def is_forking(self):
         if isinstance(self.children[0], Not):
@@ -261,6 +808,60 @@ class Not(ComplexProposition):
 
 # Helpers
 
+# Numbers for the new variables of `Proposition.to_tseitin`
+_tseitin_variables = itertools.count(1)
+
+
+def is_tautological(clause: Tuple[Proposition, ...]) -> bool:
+    """
+    Whether a clause (a disjunction of literals) contains a literal and its negation, or `⊤`.
+    """
+    literals = set(clause)
+    return any(l.negate() in literals or l == T() or l == Not(F()) for l in literals)
+
+# Propositions nested deeper than this are not compiled into nested closures (see `Proposition.compile`).
+MAX_COMPILED_DEPTH = 200
+
+
+def evaluator(order: List[Proposition], index: Dict[str, int]) -> Callable[[Sequence[bool]], bool]:
+    """
+    Returns a function that evaluates the last proposition in `order` (see `Proposition.subpropositions`)
+    without recursion, by evaluating all subpropositions one after another.
+    """
+    def evaluate(values: Sequence[bool]) -> bool:
+        results: Dict[Proposition, bool] = {}
+        for p in order:
+            if isinstance(p, Variable):
+                results[p] = values[index[p.name]]
+            elif isinstance(p, TruthValue):
+                results[p] = p.value
+            else:
+                results[p] = p.operator(*[results[c] for c in p.children])
+        return results[order[-1]]
+    return evaluate
+
 
 # Flattens a list of lists to a list.
 flat = itertools.chain.from_iterable
+
+
+def variable_column(position: int, count: int) -> int:
+    """
+    The column (see `Proposition.eval_columns`) of the variable at `position` out of `count` variables
+    in a full truth table, with the rows ordered as in `Proposition.truthtable()`:
+    The variable is true in the first half of each block of `2 ** (count - position)` rows.
+    """
+    block = 1 << (count - position - 1)
+    column = (1 << block) - 1
+    width = 2 * block
+    while width < 1 << count:
+        column |= column << width
+        width *= 2
+    return column
+
+
+def column_bits(column: int, count: int) -> Iterator[bool]:
+    """
+    The first `count` bits of a column (see `Proposition.eval_columns`) as truth values.
+    """
+    return (b == '1' for b in reversed(format(column, '0' + str(count) + 'b')))
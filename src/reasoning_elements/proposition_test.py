@@ -1,12 +1,17 @@
 from reasoning_elements.proposition import *
+from propositional_parser import parse
+import functools
+import pytest
 
 
 def test_tertium_non_datur():
     # B or not B
     shakespeare = Or('B', Not('B'))
-    assert str(shakespeare) == 'B ∨ ¬B'
-    assert shakespeare.truthtable() == [({'B': True}, True),
-                                        ({'B': False}, True)]
+    # A disjunction with a child and its negation is simplified when it is built.
+    assert shakespeare == T()
+    assert shakespeare.truthtable() == [({}, True)]
+    assert Or(Not('B'), 'C', 'B') == T()
+    assert And('B', 'C', Not('B')) == F()
 
 
 def test_implies():
@@ -71,7 +76,7 @@ def test_and():
 def test_and_and():
     # A and B and C
     multiconj = And('A', And('B', 'C'))
-    assert str(multiconj) == 'A ∧ (B ∧ C)'
+    assert str(multiconj) == 'A ∧ B ∧ C'
     assert multiconj.truthtable() == [({'A': True, 'B': True, 'C': True}, True),
                                       ({'A': True, 'B': True, 'C': False}, False),
                                       ({'A': True, 'B': False, 'C': True}, False),
@@ -85,7 +90,7 @@ def test_and_and():
 def test_and_not():
     # A and not B and C
     multiconjnb = And('A', And(Not('B'), 'C'))
-    assert str(multiconjnb) == 'A ∧ (¬B ∧ C)'
+    assert str(multiconjnb) == 'A ∧ ¬B ∧ C'
     assert multiconjnb.truthtable() == [({'A': True, 'B': True, 'C': True}, False),
                                         ({'A': True, 'B': True, 'C': False}, False),
                                         ({'A': True, 'B': False, 'C': True}, True),
@@ -174,3 +179,165 @@ def test_false():
     f = F()
     assert str(f) == 'False'
     assert f.truthtable() == [({}, False)]
+
+
+def test_interning():
+    # Building the same proposition twice yields the same object
+    assert And('A', Not('B')) is And(Variable('A'), Not(Variable('B')))
+    assert T() is T()
+    assert And('A', 'B') is not And('B', 'A')
+    assert Or('A', 'B') is not And('A', 'B')
+    assert len({Implies('A', 'B'), Implies('A', 'B'), Implies('B', 'A')}) == 2
+
+
+def test_interning_threads():
+    from concurrent.futures import ThreadPoolExecutor
+    names = [str(i) for i in range(200)]
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(
+            lambda _: [Or(Not(name), 'Z') for name in names], range(8)))
+    for propositions in results:
+        assert all(a is b for a, b in zip(propositions, results[0]))
+
+
+def test_rule_identity():
+    from reasoning_elements.rule import Rule
+    # The defeasible level does not distinguish rules: the rule that exists already is returned.
+    rule = Rule(Variable('a'), Variable('c'), 5)
+    assert Rule(Variable('a'), Variable('c'), 3) is rule
+    assert rule.defeasible_level == 5
+    assert Rule(Variable('a'), Variable('d'), 3).defeasible_level == 3
+
+
+def test_immutable():
+    a = And('A', 'B')
+    with pytest.raises(AttributeError):
+        a.children = (Variable('C'),)
+    with pytest.raises(AttributeError):
+        Variable('A').name = 'B'
+    assert str(a) == 'A ∧ B'
+
+
+def test_compile():
+    # (A and B) imply not C
+    p = Implies(And('A', 'B'), Not('C'))
+    f = p.compile()
+    assert f is p.compile()
+    assert p.variables() == ['A', 'B', 'C']
+    assert f([True, True, True]) is False
+    assert f([True, True, False]) is True
+    assert f([False, True, True]) is True
+    assert [f(list(model.values())) for model, _ in p.truthtable()] \
+        == [p.eval(model) for model, _ in p.truthtable()]
+
+
+def test_eval_missing_variable():
+    with pytest.raises(KeyError, match='variable B'):
+        And('A', 'B').eval({'A': True})
+    assert And('A', 'B').eval({'A': True, 'B': True, 'C': False})
+
+
+def test_truthtable_columns():
+    # (A or B) and not (C equals D)
+    p = And(Or('A', 'B'), Not(Equiv('C', 'D')))
+    expected = [value for _, value in p.truthtable()]
+    for chunk_size in [0, 1, 3, 4, 20]:
+        chunks = list(p.truthtable_columns(chunk_size))
+        assert len(chunks) == 2 ** max(4 - chunk_size, 0)
+        assert [v for _, column, rows in chunks
+                for v in column_bits(column, rows)] == expected
+        assert p.count_models(chunk_size) == expected.count(True) == 6
+    assert p.is_satisfiable()
+    assert not p.is_valid()
+
+
+def test_nary():
+    a, b, c = Variable('A'), Variable('B'), Variable('C')
+    # Flattening and leaving out repeated children
+    assert And(a, And(b, And(a, c))) is And(a, b, c)
+    assert parse('(A ∨ B) ∨ (B ∨ C)') is Or(a, b, c)
+    assert And(a, Or(b, c)).children == (a, Or(b, c))
+    # Truth values
+    assert And(a, T(), b) is And(a, b)
+    assert Or(a, F()) is a and Or(a, T()) == T() and And(a, F()) == F()
+    assert And() == T() and Or() == F()
+    # Decomposing takes a single step
+    assert And(a, b, c).decompose() == [[a, b, c]]
+    assert Or(a, b, c).decompose() == [[a], [b], [c]]
+    assert Not(Or(a, b, c)).decompose() == [[Not(a), Not(b), Not(c)]]
+    assert Not(And(a, b, c)).decompose() == [[Not(a)], [Not(b)], [Not(c)]]
+    for p in [And(a, Not(b), c), Or(Not(a), b, c)]:
+        assert str(p) in ['A ∧ ¬B ∧ C', '¬A ∨ B ∨ C']
+        assert p.truthtable() == [(model, p.operator(*[child.eval(model) for child in p.children]))
+                                  for model, _ in p.truthtable()]
+        assert p.count_models() == p.to_tseitin().count_models()
+        assert Equiv(p, p.to_cnf()).is_valid()
+
+
+def test_large_truthtable():
+    # A conjunction and a disjunction of 20 variables,
+    # scanned in chunks of 2 ** 12 rows
+    variables = ['X' + str(i) for i in range(20)]
+    conjunction = functools.reduce(And, variables)
+    disjunction = functools.reduce(Or, variables)
+    assert conjunction.count_models(12) == 1
+    assert disjunction.count_models(12) == 2 ** 20 - 1
+    assert conjunction.is_satisfiable(12)
+    assert not disjunction.is_valid(12)
+    assert Or(disjunction, Not(conjunction)).is_valid(12)
+    assert not And(conjunction, Not('X3')).is_satisfiable(12)
+
+
+def test_eval_batch():
+    numpy = pytest.importorskip('numpy')
+    # (A and B) imply not C
+    p = Implies(And('A', 'B'), Not('C'))
+    models = [model for model, _ in p.truthtable()]
+    expected = [p.eval(model) for model in models]
+    columns = {name: numpy.array([model[name] for model in models])
+               for name in ['A', 'B', 'C']}
+    assert p.eval_batch(columns).tolist() == expected
+    rows = numpy.array([[model[name] for name in ['C', 'A', 'B']]
+                        for model in models])
+    assert p.eval_batch(rows, ['C', 'A', 'B']).tolist() == expected
+    assert p.eval_batch(rows, {'A': 1, 'B': 2, 'C': 0}).tolist() == expected
+    assert T().eval_batch(columns).tolist() == [True] * 8
+    assert Not(F()).eval_batch(rows, ['C', 'A', 'B']).tolist() == [True] * 8
+    with pytest.raises(KeyError, match='variable C'):
+        p.eval_batch(rows[:, 1:], ['A', 'B'])
+
+
+def test_nnf():
+    assert str(parse('¬(A → (B ↔ C))').to_nnf()) == 'A ∧ ((B ∧ ¬C) ∨ (¬B ∧ C))'
+    assert parse('¬(¬A)').to_nnf() is Variable('A')
+    assert parse('¬(A ∨ B ∨ true)').to_nnf() == F()
+    assert str(parse('¬(A ∨ B ∨ (¬C))').to_nnf()) == '¬A ∧ ¬B ∧ C'
+    # The conversion is remembered
+    p = parse('(A ↔ B) ↔ C')
+    assert p.to_nnf() is p.to_nnf()
+    assert Equiv(p, p.to_nnf()).is_valid()
+
+
+def test_cnf():
+    p = parse('(A ∧ B) ∨ (C ∧ D)')
+    assert str(p.to_cnf()) == '(A ∨ C) ∧ (A ∨ D) ∧ (B ∨ C) ∧ (B ∨ D)'
+    assert parse('A ∨ (¬A)').to_cnf() == T()
+    assert F().cnf_clauses() == [()] and F().to_cnf() == F()
+    assert parse('(A ∨ B) ∧ (A ∨ B)').cnf_clauses() == [(Variable('A'), Variable('B'))]
+    p = parse('(A ↔ B) ↔ (C ↔ D)')
+    assert Equiv(p, p.to_cnf()).is_valid()
+    # Distributing can make the CNF exponentially big
+    big = functools.reduce(Or, [And('A' + 'x' * i, 'B' + 'x' * i) for i in range(16)])
+    with pytest.raises(ValueError):
+        big.to_cnf(max_clauses=1000)
+    assert len(big.to_tseitin().variables()) == 32 + 16 + 1
+
+
+def test_tseitin():
+    p = parse('(A ∧ B) ∨ ((¬(A ∧ B)) → C)')
+    t = p.to_tseitin()
+    # One new variable for each conjunction, disjunction and implication, but not for the negation
+    assert len(t.variables()) == 3 + 3
+    assert t.count_models() == p.count_models()
+    assert not parse('(A ↔ B) ∧ (A ↔ (¬B))').to_tseitin().is_satisfiable()
+    assert p.to_tseitin() is t
@@ -3,24 +3,29 @@ from reasoning_elements.proposition import *
 
 
 @functools.total_ordering
-class Rule:
+class Rule(Immutable):
+    __slots__ = ('defeasible_level', 'antecedence', 'consequence')
+
+    @classmethod
+    def _normalize(cls, antecedence: Proposition, consequence: Proposition, default_defeasible_level=5) -> tuple:
+        return (antecedence, consequence, default_defeasible_level)
+
+    @classmethod
+    def _identity(cls, args: tuple) -> tuple:
+        # A rule is identified by its antecedence and consequence only (as it was when rules were compared as strings),
+        # so a rule that exists already keeps its defeasible level.
+        return args[:2]
 
     def __init__(self, antecedence: Proposition, consequence: Proposition, default_defeasible_level=5):
         self.defeasible_level = default_defeasible_level
         self.antecedence = antecedence
         self.consequence = consequence
 
+    def __reduce__(self):
+        return (Rule, (self.antecedence, self.consequence, self.defeasible_level))
+
     def __str__(self):
         return str(self.antecedence) + ' ~> ' + str(self.consequence)
 
     def is_decomposable(self) -> bool:
         return self.consequence.is_decomposable()
-
-    def __eq__(self, other):
-        return str(self) == str(other)
-
-    def __lt__(self, other):
-        return str(self) < str(other)
-
-    def __hash__(self):
-        return hash(str(self))
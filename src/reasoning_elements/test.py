@@ -1,22 +1,20 @@
 from reasoning_elements.proposition import *
 
 
-class Test:
+class Test(Immutable):
+    __slots__ = ('content',)
     content: Not
 
     def __init__(self, content: Not):
         self.content = content
 
+    def __reduce__(self):
+        return (Test, (self.content,))
+
     def __str__(self):
         return str(self.content) + '?'
 
     def nonnegated_content(self) -> Proposition:
         return self.content.children[0]
 
-    def __eq__(self, other):
-        return str(self) == str(other)
-
-    def __hash__(self):
-        return hash(str(self))
-
     __test__ = False  # tell pytest that this has nothing to do with testing
@@ -0,0 +1,299 @@
+from reasoning_elements.proposition import *
+from typing import *
+import heapq
+
+"""
+A SAT solver with conflict-driven clause learning (CDCL), for propositions that are too big for the tableau.
+The tableau in `propositional_tableau.py` explains its result, but may need exponentially many branches;
+the solver only answers whether a proposition is satisfiable, and with which model.
+
+A proposition is first converted into clauses with the Tseitin transformation (see `tseitin`).
+Variables are numbered from 1, and a literal is either the number `v` of a variable or its negation `-v`.
+The solver then
+    - propagates unit clauses, watching two literals of each clause, so that only clauses where
+      one of these becomes false need to be looked at,
+    - learns a clause from each conflict (at the first unique implication point) and jumps back,
+    - chooses the variable with the highest activity to branch on (VSIDS):
+      variables in recent conflicts get more active,
+    - restarts after a number of conflicts that follows the Luby sequence, keeping the learned clauses.
+"""
+
+# Number of conflicts per unit of the Luby sequence before a restart
+RESTART_INTERVAL = 100
+# Factor by which the activities of all variables decay after each conflict
+ACTIVITY_DECAY = 0.95
+
+
+def find_model(proposition: Proposition) -> Optional[Dict[str, bool]]:
+    """
+    Returns a model in which the proposition is true, or `None` if there is none.
+    """
+    clauses, variables, count = tseitin(proposition)
+    values = Solver(count, clauses).solve()
+    if values is None:
+        return None
+    return {name: values[variables[name]] for name in sorted(variables)}
+
+
+def tseitin(proposition: Proposition) -> Tuple[List[List[int]], Dict[str, int], int]:
+    """
+    Converts the proposition into clauses that are satisfiable if and only if the proposition is.
+    Every complex subproposition gets a new variable, with clauses that make it equivalent to the subproposition
+    (see `ComplexProposition.clauses`); only negations are just the negated literal of their child.
+    Shared subpropositions are converted only once.
+    Returns the clauses, the numbers of the variables of the proposition by name, and the number of variables.
+    """
+    variables: Dict[str, int] = {}
+    literals: Dict[Proposition, int] = {}
+    clauses: List[List[int]] = []
+    count = 0
+    for p in proposition.subpropositions():
+        if isinstance(p, Not):
+            literals[p] = -literals[p.children[0]]
+            continue
+        count += 1
+        literals[p] = count
+        if isinstance(p, Variable):
+            variables[p.name] = count
+        elif isinstance(p, TruthValue):
+            clauses.append([count if p.value else -count])
+        else:
+            clauses.extend(p.clauses(count, *[literals[c] for c in p.children]))
+    clauses.append([literals[proposition]])
+    return clauses, variables, count
+
+
+class Solver:
+    """
+    CDCL solver for a fixed number of variables and a set of clauses.
+    """
+
+    def __init__(self, count: int, clauses: Iterable[List[int]]):
+        self.count = count
+        # The value, decision level, and reason (the clause that implied it) of each variable, by its number
+        self.values: List[Optional[bool]] = [None] * (count + 1)
+        self.levels: List[int] = [0] * (count + 1)
+        self.reasons: List[Optional[List[int]]] = [None] * (count + 1)
+        # The assigned literals in order, and where each decision level starts in it
+        self.trail: List[int] = []
+        self.trail_limits: List[int] = []
+        # Position in the trail up to which the literals have been propagated
+        self.propagated = 0
+        # The clauses in which each literal is one of the first two (watched) literals
+        self.watches: Dict[int, List[List[int]]] = {}
+        for v in range(1, count + 1):
+            self.watches[v] = []
+            self.watches[-v] = []
+        self.learned: List[List[int]] = []
+        self.activity: List[float] = [0.0] * (count + 1)
+        self.increment = 1.0
+        # Unassigned variables by activity; entries may be outdated, and are skipped then (see `decide`).
+        self.heap: List[Tuple[float, int]] = [(0.0, v) for v in range(1, count + 1)]
+        # The last value of each variable, which is tried first again
+        self.phases: List[bool] = [False] * (count + 1)
+        self.inconsistent = False
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def add_clause(self, clause: List[int]):
+        """
+        Adds a clause before solving.
+        """
+        literals: List[int] = []
+        for literal in clause:
+            value = self.value(literal)
+            if value is True or -literal in literals:
+                # The clause is satisfied already.
+                return
+            if value is None and literal not in literals:
+                literals.append(literal)
+        if len(literals) == 0:
+            self.inconsistent = True
+        elif len(literals) == 1:
+            self.assign(literals[0], None)
+            if self.propagate() is not None:
+                self.inconsistent = True
+        else:
+            self.watch(literals)
+
+    def solve(self) -> Optional[List[Optional[bool]]]:
+        """
+        Returns the value of each variable (by its number; the first item is unused) in a model of the clauses,
+        or `None` if they are unsatisfiable.
+        """
+        if self.inconsistent:
+            return None
+        conflicts = 0
+        restarts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if len(self.trail_limits) == 0:
+                    return None
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.learned.append(learned)
+                    self.watch(learned)
+                    self.assign(learned[0], learned)
+                self.increment /= ACTIVITY_DECAY
+                conflicts += 1
+            elif conflicts >= luby(restarts + 1) * RESTART_INTERVAL:
+                conflicts = 0
+                restarts += 1
+                self.backtrack(0)
+            else:
+                variable = self.decide()
+                if variable is None:
+                    return list(self.values)
+                self.trail_limits.append(len(self.trail))
+                self.assign(variable if self.phases[variable] else -variable, None)
+
+    def value(self, literal: int) -> Optional[bool]:
+        value = self.values[abs(literal)]
+        if value is None or literal > 0:
+            return value
+        return not value
+
+    def assign(self, literal: int, reason: Optional[List[int]]):
+        variable = abs(literal)
+        self.values[variable] = literal > 0
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def watch(self, clause: List[int]):
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def propagate(self) -> Optional[List[int]]:
+        """
+        Assigns the literals implied by unit clauses, until there are no more, or until a clause is false.
+        Returns that clause in case of a conflict.
+        """
+        while self.propagated < len(self.trail):
+            false = -self.trail[self.propagated]
+            self.propagated += 1
+            watching = self.watches[false]
+            kept = 0
+            for i, clause in enumerate(watching):
+                # The false literal is moved to the second position.
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                first = clause[0]
+                if self.value(first) is not True:
+                    # Find another literal that is not false to watch instead:
+                    for k in range(2, len(clause)):
+                        if self.value(clause[k]) is not False:
+                            clause[1], clause[k] = clause[k], false
+                            self.watches[clause[1]].append(clause)
+                            break
+                    else:
+                        # The clause is unit (or false), so it stays watched here.
+                        watching[kept] = clause
+                        kept += 1
+                        if self.value(first) is False:
+                            watching[kept:] = watching[i + 1:]
+                            return clause
+                        self.assign(first, clause)
+                    continue
+                watching[kept] = clause
+                kept += 1
+            del watching[kept:]
+        return None
+
+    def analyze(self, conflict: List[int]) -> Tuple[List[int], int]:
+        """
+        Derives a clause from the conflict by resolving it with the reasons of the literals of the current decision level,
+        until only one of them is left (the first unique implication point).
+        Returns the clause, with that literal first, and the level to jump back to, where the clause becomes unit.
+        """
+        level = len(self.trail_limits)
+        learned = [0]
+        seen: Set[int] = set()
+        pending = 0
+        clause = conflict
+        literal = 0
+        index = len(self.trail) - 1
+        while True:
+            for q in clause:
+                variable = abs(q)
+                if q != literal and variable not in seen and self.levels[variable] > 0:
+                    seen.add(variable)
+                    self.bump(variable)
+                    if self.levels[variable] == level:
+                        pending += 1
+                    else:
+                        learned.append(q)
+            # The next literal of the current level to resolve on, going back in the trail
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(literal)]
+        learned[0] = -literal
+        if len(learned) == 1:
+            return learned, 0
+        # The literal of the highest remaining level is watched as well.
+        second = max(range(1, len(learned)),
+                     key=lambda i: self.levels[abs(learned[i])])
+        learned[1], learned[second] = learned[second], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def backtrack(self, level: int):
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.values[variable] = None
+            self.reasons[variable] = None
+            self.phases[variable] = literal > 0
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.propagated = start
+
+    def bump(self, variable: int):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            # Rescale all activities, so that they don't overflow.
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+            self.heap = [(-self.activity[v], v) for v in range(1, self.count + 1)
+                         if self.values[v] is None]
+            heapq.heapify(self.heap)
+        elif self.values[variable] is None:
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+
+    def decide(self) -> Optional[int]:
+        """
+        Returns the unassigned variable with the highest activity, or `None` if all variables are assigned.
+        """
+        while len(self.heap) > 0:
+            activity, variable = heapq.heappop(self.heap)
+            if self.values[variable] is None and -activity == self.activity[variable]:
+                return variable
+        # Outdated entries may hide unassigned variables.
+        for variable in range(1, self.count + 1):
+            if self.values[variable] is None:
+                return variable
+        return None
+
+
+def luby(i: int) -> int:
+    """
+    The `i`-th number (counting from 1) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ...
+    """
+    while True:
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+        if (1 << k) - 1 == i:
+            return 1 << (k - 1)
+        i -= (1 << (k - 1)) - 1
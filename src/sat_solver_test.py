@@ -0,0 +1,76 @@
+from reasoning_elements.proposition import *
+from sat_solver import *
+from propositional_parser import parse
+import functools
+import itertools
+import random
+
+
+def test_tseitin():
+    clauses, variables, count = tseitin(parse('(A ∧ B) ∨ (¬A)'))
+    assert variables == {'A': 1, 'B': 2}
+    # A, B, A ∧ B and the disjunction get a variable each; the negation doesn't.
+    assert count == 4
+    assert clauses[-1] == [4]
+    # Shared subpropositions are converted once
+    _, _, count = tseitin(parse('(A ∧ B) ∨ ((A ∧ B) → C)'))
+    assert count == 6
+
+
+def test_luby():
+    assert [luby(i) for i in range(1, 16)] \
+        == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+
+
+def test_find_model():
+    assert find_model(parse('(A ∨ B) ∧ (¬A)')) == {'A': False, 'B': True}
+    assert find_model(parse('(A ∨ B) ∧ (¬A) ∧ (¬B)')) is None
+    assert find_model(parse('A ∧ false')) is None
+    assert find_model(parse('A ∨ false')) == {'A': True}
+    assert find_model(parse('A ↔ (¬A)')) is None
+
+
+def random_proposition(generator: random.Random, depth: int) -> Proposition:
+    if depth == 0 or generator.random() < 0.2:
+        return Variable(generator.choice('ABCDEF'))
+    operator = generator.choice([And, Or, Implies, Equiv, Not])
+    if operator is Not:
+        return Not(random_proposition(generator, depth - 1))
+    return operator(random_proposition(generator, depth - 1),
+                    random_proposition(generator, depth - 1))
+
+
+def test_agrees_with_truth_table():
+    generator = random.Random(0)
+    for _ in range(300):
+        p = random_proposition(generator, 5)
+        model = find_model(p)
+        assert (model is not None) == p.is_satisfiable()
+        if model is not None:
+            assert p.eval(model)
+
+
+def test_pigeonhole():
+    # 5 pigeons don't fit into 4 holes, one pigeon per hole
+    pigeons, holes = range(5), range(4)
+    def sits(p, h): return Variable('P' + str(p) + 'H' + str(h))
+    every_pigeon_sits = [functools.reduce(Or, [sits(p, h) for h in holes])
+                         for p in pigeons]
+    no_hole_is_shared = [Not(And(sits(p, h), sits(q, h)))
+                         for h in holes
+                         for p, q in itertools.combinations(pigeons, 2)]
+    assert find_model(functools.reduce(
+        And, every_pigeon_sits + no_hole_is_shared)) is None
+    # But 4 pigeons do:
+    model = find_model(functools.reduce(
+        And, every_pigeon_sits[:4] + no_hole_is_shared))
+    assert sum(model[sits(p, h).name] for p in range(4) for h in holes) >= 4
+
+
+def test_equivalence_chain():
+    # X0 ↔ X1, X1 ↔ X2, ..., so X0 and ¬X299 contradict each other.
+    variables = [Variable('X' + str(i)) for i in range(300)]
+    chain = functools.reduce(And, [Equiv(a, b) for a, b in zip(variables, variables[1:])])
+    assert find_model(And(chain, And(variables[0], Not(variables[-1])))) is None
+    model = find_model(And(chain, variables[0]))
+    assert all(model[v.name] for v in variables)